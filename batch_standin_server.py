@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Anthropic Message Batches endpoints, for testing bulk
+summarization without API cost.
+
+Usage:
+    python batch_standin_server.py            # listens on http://localhost:8100
+    CLAUDE_BATCH_BASE_URL=http://localhost:8100 ./start_server.sh
+
+Batches end STANDIN_BATCH_SECONDS after submission; every request succeeds
+with a placeholder summary. /v1/messages and /v1/messages/count_tokens are
+served too, so ANTHROPIC_BASE_URL can point here for a fully offline run
+(no streaming).
+"""
+
+import os
+import time
+import uuid
+import json
+from datetime import datetime, timezone, timedelta
+
+import uvicorn
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import Response
+
+PORT = int(os.getenv("STANDIN_PORT", "8100"))
+STANDIN_BATCH_SECONDS = float(os.getenv("STANDIN_BATCH_SECONDS", "5"))
+
+app = FastAPI()
+batches = {}  # batch id -> {"requests": [...], "created": timestamp}
+
+def iso(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
+
+def fake_message(params: dict) -> dict:
+    """Placeholder reply: states what was asked instead of summarizing it"""
+    text = params["messages"][-1]["content"]
+    if isinstance(text, list):
+        text = " ".join(block.get("text", "") for block in text)
+    return {
+        "id": f"msg_{uuid.uuid4().hex}",
+        "type": "message",
+        "role": "assistant",
+        "model": params.get("model", "stand-in"),
+        "content": [{"type": "text", "text": f"[stand-in summary of {len(text)} chars] {text[:80]}"}],
+        "stop_reason": "end_turn",
+        "stop_sequence": None,
+        "usage": {"input_tokens": len(text) // 2, "output_tokens": 20}
+    }
+
+def batch_object(batch_id: str, request: Request) -> dict:
+    batch = batches[batch_id]
+    ended = time.time() - batch["created"] >= STANDIN_BATCH_SECONDS
+    count = len(batch["requests"])
+    return {
+        "id": batch_id,
+        "type": "message_batch",
+        "processing_status": "ended" if ended else "in_progress",
+        "request_counts": {
+            "processing": 0 if ended else count,
+            "succeeded": count if ended else 0,
+            "errored": 0,
+            "canceled": 0,
+            "expired": 0
+        },
+        "created_at": iso(batch["created"]),
+        "expires_at": iso(batch["created"] + timedelta(days=1).total_seconds()),
+        "ended_at": iso(batch["created"] + STANDIN_BATCH_SECONDS) if ended else None,
+        "cancel_initiated_at": None,
+        "archived_at": None,
+        "results_url": f"{str(request.base_url).rstrip('/')}/v1/messages/batches/{batch_id}/results" if ended else None
+    }
+
+@app.post("/v1/messages/batches")
+async def create_batch(request: Request):
+    body = await request.json()
+    batch_id = f"msgbatch_{uuid.uuid4().hex}"
+    batches[batch_id] = {"requests": body["requests"], "created": time.time()}
+    print(f"📥 Batch {batch_id}: {len(body['requests'])} requests")
+    return batch_object(batch_id, request)
+
+@app.get("/v1/messages/batches/{batch_id}")
+def retrieve_batch(batch_id: str, request: Request):
+    if batch_id not in batches:
+        raise HTTPException(status_code=404, detail="batch not found")
+    return batch_object(batch_id, request)
+
+@app.get("/v1/messages/batches/{batch_id}/results")
+def batch_results(batch_id: str):
+    if batch_id not in batches:
+        raise HTTPException(status_code=404, detail="batch not found")
+    lines = [
+        json.dumps({
+            "custom_id": item["custom_id"],
+            "result": {"type": "succeeded", "message": fake_message(item["params"])}
+        }, ensure_ascii=False)
+        for item in batches[batch_id]["requests"]
+    ]
+    return Response("\n".join(lines) + "\n", media_type="application/binary")
+
+@app.post("/v1/messages")
+async def create_message(request: Request):
+    return fake_message(await request.json())
+
+@app.post("/v1/messages/count_tokens")
+async def count_tokens(request: Request):
+    body = await request.json()
+    return {"input_tokens": len(json.dumps(body["messages"], ensure_ascii=False)) // 2}
+
+if __name__ == "__main__":
+    uvicorn.run(app, host="0.0.0.0", port=PORT)
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark Apple Podcasts show page parsers (BeautifulSoup vs lxml).
+
+Usage:
+    python bench_apple_parsing.py --save https://podcasts.apple.com/tw/podcast/gooaye-%E8%82%A1%E7%99%8C/id1500839292
+    python bench_apple_parsing.py [fixtures/apple_show_*.html ...]
+
+Without saved pages a synthetic page of similar size is generated.
+"""
+
+import sys
+import glob
+import time
+from pathlib import Path
+
+from ubuntu_backend import extract_apple_episodes_bs4, extract_apple_episodes_lxml, http_get
+
+FIXTURE_DIR = Path("fixtures")
+ROUNDS = 20
+
+def save_fixture(url: str) -> Path:
+    response = http_get(url)
+    response.raise_for_status()
+    response.encoding = 'utf-8'
+    FIXTURE_DIR.mkdir(exist_ok=True)
+    show_id = url.rstrip('/').split('/id')[-1].split('?')[0]
+    path = FIXTURE_DIR / f"apple_show_{show_id}.html"
+    path.write_text(response.text, encoding='utf-8')
+    print(f"💾 Saved {len(response.text) / 1024:.0f}KB to {path}")
+    return path
+
+def synthetic_page(episodes: int = 50, filler_blocks: int = 4000) -> str:
+    filler = "".join(
+        f'<div class="shelf"><span class="label">item {i}</span><p>description text {i}</p></div>'
+        for i in range(filler_blocks)
+    )
+    links = "".join(
+        f'<li><a href="/tw/podcast/ep{i}/id1500839292?i=1000{700000000 + i}">'
+        f'<span>EP{i}</span> <span>標題 {i}</span></a></li>'
+        for i in range(episodes)
+    )
+    return f"<html><head><title>show</title></head><body>{filler}<ol>{links}</ol>{filler}</body></html>"
+
+def bench(name: str, parser, html: str) -> tuple:
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        episodes = parser(html)
+    elapsed_ms = (time.perf_counter() - start) / ROUNDS * 1000
+    print(f"  {name:14s} {elapsed_ms:8.2f} ms/page  ({len(episodes)} episodes)")
+    return elapsed_ms, episodes
+
+def main():
+    args = sys.argv[1:]
+    if args[:1] == ["--save"]:
+        for url in args[1:]:
+            save_fixture(url)
+        return
+
+    pages = [Path(p) for p in (args or sorted(glob.glob(str(FIXTURE_DIR / "apple_show_*.html"))))]
+    fixtures = [(p.name, p.read_text(encoding='utf-8')) for p in pages]
+    if not fixtures:
+        print("ℹ️  No saved fixture pages, using a synthetic page (save real ones with --save URL)")
+        fixtures = [("synthetic", synthetic_page())]
+
+    print("=" * 60)
+    print("⏱️  Apple Podcasts show page parsing benchmark")
+    print("=" * 60)
+
+    for name, html in fixtures:
+        print(f"\n📄 {name} ({len(html) / 1024:.0f}KB)")
+        bs4_ms, bs4_episodes = bench("BeautifulSoup", extract_apple_episodes_bs4, html)
+        lxml_ms, lxml_episodes = bench("lxml", extract_apple_episodes_lxml, html)
+        print(f"  speedup: {bs4_ms / lxml_ms:.1f}x")
+        if bs4_episodes == lxml_episodes:
+            print("  ✅ Parsers agree")
+        else:
+            print("  ❌ Parsers disagree")
+            print(f"     bs4:  {bs4_episodes[:3]}")
+            print(f"     lxml: {lxml_episodes[:3]}")
+
+if __name__ == "__main__":
+    main()
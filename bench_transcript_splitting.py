@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark transcript splitting (line-based split_text vs split_transcript),
+and how many split_transcript chunks survive an edit near the start.
+
+Usage:
+    python bench_transcript_splitting.py [fixtures/transcript_*.txt ...]
+
+Fixtures are transcript texts as sent to Claude (e.g. the "raw" field of a
+/youtube/summary or /youtube/channel/summary response). Without saved
+fixtures, a synthetic 4-hour podcast and a 10-video channel are generated.
+"""
+
+import sys
+import glob
+import time
+from pathlib import Path
+
+from ubuntu_backend import split_text, split_transcript, format_timestamp, estimate_tokens
+
+FIXTURE_DIR = Path("fixtures")
+ROUNDS = 5
+MAX_CHUNK_SIZE = 25000
+OVERLAP = 500
+TOKEN_LIMIT = 5000
+
+def synthetic_podcast(hours: int = 4) -> str:
+    segments = " ".join(
+        f"[{format_timestamp(ts)}] 今天我們來聊聊半導體產業與 AI 伺服器的供應鏈，第 {ts} 秒的內容"
+        for ts in range(0, hours * 3600, 4)
+    )
+    return f"集數: 長篇節目\n內容: {segments}"
+
+def synthetic_channel(videos: int = 10) -> str:
+    return "\n\n".join(
+        f"影片: 影片 {v}\n內容: " + " ".join(f"[{ts}] 第 {v} 支影片第 {ts} 秒的字幕內容" for ts in range(0, 1800, 3))
+        for v in range(videos)
+    )
+
+def bench(name: str, splitter, text: str) -> list:
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        chunks = splitter(text)
+    elapsed_ms = (time.perf_counter() - start) / ROUNDS * 1000
+    largest = max(len(chunk) for chunk in chunks)
+    over = sum(1 for chunk in chunks if len(chunk) > MAX_CHUNK_SIZE)
+    print(f"  {name:16s} {elapsed_ms:8.2f} ms  {len(chunks):3d} chunks  largest {largest:7d} chars  {over} over limit")
+    return chunks
+
+def main():
+    pages = [Path(p) for p in (sys.argv[1:] or sorted(glob.glob(str(FIXTURE_DIR / "transcript_*.txt"))))]
+    fixtures = [(p.name, p.read_text(encoding='utf-8')) for p in pages]
+    if not fixtures:
+        print("ℹ️  No saved transcript fixtures, using synthetic transcripts")
+        fixtures = [("synthetic podcast (4h)", synthetic_podcast()), ("synthetic channel (10 videos)", synthetic_channel())]
+
+    print("=" * 60)
+    print(f"✂️  Transcript splitting benchmark (limit {MAX_CHUNK_SIZE}, overlap {OVERLAP})")
+    print("=" * 60)
+
+    failed = False
+    for name, text in fixtures:
+        print(f"\n📄 {name} ({len(text)} chars)")
+        bench("split_text", lambda t: split_text(t, MAX_CHUNK_SIZE), text)
+        chunks = bench("split_transcript", lambda t: split_transcript(t, MAX_CHUNK_SIZE, OVERLAP), text)
+
+        if any(len(chunk) > MAX_CHUNK_SIZE for chunk in chunks):
+            print("  ❌ Chunk above the size limit")
+            failed = True
+        # Every chunk after the first should start on a segment marker or a video / episode header
+        bad_starts = [chunk[:20] for chunk in chunks[1:] if not (chunk.startswith("[") or chunk.startswith(("影片:", "集數:")))]
+        if bad_starts:
+            print(f"  ❌ {len(bad_starts)} chunks start mid-segment, e.g. {bad_starts[0]!r}")
+            failed = True
+        if not failed:
+            print("  ✅ All chunks within the limit and cut on segment boundaries")
+
+        # Chunk cache reuse after an edit near the start (a new first segment)
+        header, _, body = text.partition("內容: ")
+        edited = f"{header}內容: [0] 開場前新增的一段話 {body}" if body else "[0] 開場前新增的一段話 " + text
+        before = set(chunks)
+        after = split_transcript(edited, MAX_CHUNK_SIZE, OVERLAP)
+        reused = sum(1 for chunk in after if chunk in before)
+        print(f"  ♻️  After an edit at the start: {reused}/{len(after)} chunks unchanged (chunk cache hits)")
+
+    # One segment far over the limit, half ASCII and half CJK, measured in tokens
+    mixed = "[0] " + "a" * 30000 + "中" * 30000
+    chunks = split_transcript(mixed, TOKEN_LIMIT, OVERLAP, measure=estimate_tokens)
+    largest = max(estimate_tokens(chunk) for chunk in chunks)
+    print(f"\n📄 oversized mixed-script segment: {len(chunks)} chunks, largest ~{largest} tokens (limit {TOKEN_LIMIT})")
+    if largest > TOKEN_LIMIT:
+        print("  ❌ Chunk above the token limit")
+        failed = True
+
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
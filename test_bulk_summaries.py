@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Test script to verify offline bulk summarization.
+
+Run against the batch stand-in to avoid API cost:
+    python batch_standin_server.py &
+    CLAUDE_BATCH_BASE_URL=http://localhost:8100 BULK_POLL_SECONDS=2 ./start_server.sh
+"""
+
+import requests
+import time
+
+BASE_URL = "http://localhost:8000"
+
+def test_bulk_summaries():
+    print("=" * 60)
+    print("📦 Testing Bulk Summarization")
+    print("=" * 60)
+
+    video_urls = [
+        "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+        "https://www.youtube.com/watch?v=jNQXAC9IVRw",
+    ]
+
+    print(f"\n📤 Starting bulk job for {len(video_urls)} videos...")
+    response = requests.post(f"{BASE_URL}/bulk/summaries", json={"urls": video_urls})
+    response.raise_for_status()
+    job = response.json()
+    print(f"  ✅ Job id: {job['id']}, status: {job['status']}")
+
+    print("\n⏳ Polling job status...")
+    for _ in range(60):
+        time.sleep(5)
+        job = requests.get(f"{BASE_URL}/bulk/summaries/{job['id']}").json()
+        print(f"  status: {job['status']}, requests: {job.get('requests')}, "
+              f"succeeded: {job.get('succeeded')}, errored: {job.get('errored')}")
+        if job['status'] in ("done", "failed"):
+            break
+
+    if job['status'] == "done":
+        print("\n✅ Bulk job finished")
+        for summary in job.get('summaries', []):
+            print(f"  - {summary['url']}: {summary.get('view_url') or summary.get('error')}")
+    else:
+        print(f"\n❌ Bulk job did not finish: {job.get('error', job['status'])}")
+
+    print("\n" + "=" * 60)
+    print("✅ Bulk summarization test completed!")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    try:
+        test_bulk_summaries()
+    except requests.exceptions.ConnectionError:
+        print("❌ Error: Cannot connect to server. Is it running?")
+        print("   Start it with: ./start_server.sh")
+    except Exception as e:
+        print(f"❌ Error: {e}")
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""Test script to verify subscription registry and background pre-summarization"""
+
+import requests
+import time
+
+BASE_URL = "http://localhost:8000"
+
+def test_subscriptions():
+    print("=" * 60)
+    print("📡 Testing Subscriptions")
+    print("=" * 60)
+    
+    podcast_url = "https://podcasts.apple.com/tw/podcast/gooaye-%E8%82%A1%E7%99%8C/id1500839292"
+    
+    print(f"\n➕ Subscribing to: {podcast_url}")
+    response = requests.post(f"{BASE_URL}/subscriptions", json={"url": podcast_url, "max_items": 1})
+    response.raise_for_status()
+    subscription = response.json()
+    print(f"  ✅ id: {subscription['id']}, type: {subscription['type']}")
+    
+    print("\n⏳ Waiting for the first poll...")
+    for _ in range(12):
+        time.sleep(10)
+        status = requests.get(f"{BASE_URL}/subscriptions").json()
+        sub = next(s for s in status['subscriptions'] if s['id'] == subscription['id'])
+        if sub.get('last_checked'):
+            print(f"  ✅ Polled, {len(sub['last_item_urls'])} item(s), "
+                  f"next check in {sub['interval_seconds']}s, queued jobs: {status['queued_jobs']}")
+            break
+    else:
+        print("  ⚠️ Not polled yet (is SUBSCRIPTION_POLLER_ENABLED=1?)")
+    
+    print("\n🗑️  Removing subscription...")
+    response = requests.delete(f"{BASE_URL}/subscriptions/{subscription['id']}")
+    print(f"  Status: {response.status_code}")
+    
+    print("\n" + "=" * 60)
+    print("✅ Subscription test completed!")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    try:
+        test_subscriptions()
+    except requests.exceptions.ConnectionError:
+        print("❌ Error: Cannot connect to server. Is it running?")
+        print("   Start it with: ./start_server.sh")
+    except Exception as e:
+        print(f"❌ Error: {e}")
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""Test script to verify transcription performance metrics"""
+
+import requests
+
+BASE_URL = "http://localhost:8000"
+
+def test_transcription_metrics():
+    print("=" * 60)
+    print("📈 Testing Transcription Metrics")
+    print("=" * 60)
+    
+    response = requests.get(f"{BASE_URL}/metrics/transcription", params={"limit": 5})
+    response.raise_for_status()
+    metrics = response.json()
+    
+    overall = metrics['overall']
+    print(f"\n📊 Transcriptions recorded: {overall['count']}")
+    if overall['count']:
+        rtf = overall['real_time_factor']
+        print(f"  RTF p50/p90/p99: {rtf['p50']} / {rtf['p90']} / {rtf['p99']}")
+        sps = overall['segments_per_second']
+        print(f"  Segments/s p50: {sps['p50']}")
+    
+    for model, stats in metrics['by_model'].items():
+        print(f"\n  🎛️  {model}: {stats['count']} runs, RTF p50 {stats['real_time_factor']['p50']}")
+    
+    print("\n🕒 Recent transcriptions:")
+    for record in metrics['recent']:
+        print(f"  {record['recorded_at']} {record['model']:10s} "
+              f"{record['audio_seconds']:8.0f}s audio in {record['decode_seconds']:7.1f}s "
+              f"(language: {record['language_source']})")
+    
+    print("\n" + "=" * 60)
+    print("✅ Transcription metrics test completed!")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    try:
+        test_transcription_metrics()
+    except requests.exceptions.ConnectionError:
+        print("❌ Error: Cannot connect to server. Is it running?")
+        print("   Start it with: ./start_server.sh")
+    except Exception as e:
+        print(f"❌ Error: {e}")
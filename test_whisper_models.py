@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""Test script to verify Whisper model registry and per-request routing"""
+
+import requests
+
+BASE_URL = "http://localhost:8000"
+
+def test_whisper_models():
+    print("=" * 60)
+    print("🎛️  Testing Whisper Model Registry")
+    print("=" * 60)
+    
+    response = requests.get(f"{BASE_URL}/whisper/models")
+    registry = response.json()
+    print(f"\n📦 Default model: {registry['default_model']}")
+    print(f"   Memory: {registry['memory_in_use_mb']}/{registry['memory_budget_mb']} MB")
+    for model in registry['models']:
+        status = "loaded" if model['loaded'] else "lazy"
+        print(f"   - {model['name']:15s} {model['compute_type']:8s} {model['memory_mb']:5d}MB ({status})")
+    
+    # Short podcast episode with an explicit fast model
+    podcast_url = "https://podcasts.apple.com/tw/podcast/gooaye-%E8%82%A1%E7%99%8C/id1500839292?i=1000738486982"
+    print("\n🔄 Requesting transcription with model=tiny...")
+    response = requests.post(
+        f"{BASE_URL}/apple_podcast",
+        json={"url": podcast_url, "model": "tiny"},
+        timeout=600
+    )
+    if response.status_code == 200:
+        result = response.json()
+        print(f"  ✅ Transcribed with: {result.get('whisper_model', 'cached')}")
+    else:
+        print(f"  ❌ Failed: {response.status_code} {response.text}")
+    
+    # Unknown model should be rejected
+    print("\n🔄 Requesting transcription with an unknown model...")
+    response = requests.post(
+        f"{BASE_URL}/yt",
+        json={"url": "https://www.youtube.com/watch?v=dQw4w9WgXcQ", "model": "huge"}
+    )
+    print(f"  Status: {response.status_code} (400 expected unless cached or subtitles exist)")
+    
+    print("\n" + "=" * 60)
+    print("✅ Whisper model test completed!")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    try:
+        test_whisper_models()
+    except requests.exceptions.ConnectionError:
+        print("❌ Error: Cannot connect to server. Is it running?")
+        print("   Start it with: ./start_server.sh")
+    except Exception as e:
+        print(f"❌ Error: {e}")
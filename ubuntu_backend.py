@@ -9,21 +9,34 @@ import yt_dlp
 import re
 import json
 import hashlib
+import zlib
+import threading
+import time
+import queue
+import asyncio
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from fastapi import FastAPI, HTTPException
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import BaseModel
 from contextlib import asynccontextmanager
 from typing import List, Optional
 from datetime import datetime
 import requests
+import feedparser
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib.parse import urlparse
 from bs4 import BeautifulSoup
+import lxml.html
 from faster_whisper import WhisperModel
+from faster_whisper.audio import decode_audio
 
 # Anthropic client
 try:
-    from anthropic import Anthropic
+    from anthropic import Anthropic, AsyncAnthropic
     ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
     if ANTHROPIC_API_KEY:
         anthropic_client = Anthropic(api_key=ANTHROPIC_API_KEY)
@@ -35,14 +48,89 @@ except Exception as e:
     anthropic_client = None
     print(f"⚠️ Anthropic initialization failed: {e}")
 
-# Global Whisper model (will be preloaded at startup)
-WHISPER_MODEL = None
-WHISPER_MODEL_SIZE = "base"
-
 # Cache directory
 CACHE_DIR = Path(".cache")
 CACHE_DIR.mkdir(exist_ok=True)
 
+# Whisper model registry (default model is preloaded at startup, others load lazily)
+WHISPER_MODEL_SIZE = os.getenv("WHISPER_MODEL_SIZE", "base")
+WHISPER_MEMORY_BUDGET_MB = int(os.getenv("WHISPER_MEMORY_BUDGET_MB", "6000"))
+
+# name -> faster_whisper size, compute type, approx. GPU memory (MB) and approx. speed (x realtime)
+WHISPER_MODEL_SPECS = {
+    "tiny":           {"model_size": "tiny",   "compute_type": "int8",    "memory_mb": 300,  "speed": 60},
+    "base":           {"model_size": "base",   "compute_type": "float16", "memory_mb": 500,  "speed": 40},
+    "base-int8":      {"model_size": "base",   "compute_type": "int8",    "memory_mb": 350,  "speed": 45},
+    "small":          {"model_size": "small",  "compute_type": "int8",    "memory_mb": 900,  "speed": 20},
+    "small-float32":  {"model_size": "small",  "compute_type": "float32", "memory_mb": 1900, "speed": 10},
+    "medium":         {"model_size": "medium", "compute_type": "int8",    "memory_mb": 1800, "speed": 8},
+    "medium-float32": {"model_size": "medium", "compute_type": "float32", "memory_mb": 4200, "speed": 3},
+}
+
+_whisper_models = OrderedDict()  # name -> WhisperModel, least recently used first
+_whisper_models_lock = threading.Lock()
+
+WHISPER_SAMPLE_RATE = 16000
+
+# Concurrency limits for channel / show processing: items in flight, caption fetches, Whisper runs
+CHANNEL_ITEM_CONCURRENCY = int(os.getenv("CHANNEL_ITEM_CONCURRENCY", "4"))
+CAPTION_FETCH_CONCURRENCY = int(os.getenv("CAPTION_FETCH_CONCURRENCY", "4"))
+AUDIO_TRANSCRIPTION_CONCURRENCY = int(os.getenv("AUDIO_TRANSCRIPTION_CONCURRENCY", "1"))
+# Decoded files held in memory (~230MB of float32 PCM per hour): the GPU runs plus one decoding ahead
+AUDIO_DECODE_CONCURRENCY = int(os.getenv("AUDIO_DECODE_CONCURRENCY", str(AUDIO_TRANSCRIPTION_CONCURRENCY + 1)))
+_caption_fetch_semaphore = threading.BoundedSemaphore(CAPTION_FETCH_CONCURRENCY)
+_transcription_semaphore = threading.BoundedSemaphore(AUDIO_TRANSCRIPTION_CONCURRENCY)
+_audio_decode_semaphore = threading.BoundedSemaphore(AUDIO_DECODE_CONCURRENCY)
+
+# Claude model used for summaries, its output limit and context windows (tokens)
+CLAUDE_MODEL = os.getenv("CLAUDE_MODEL", "claude-3-5-haiku-latest")
+CLAUDE_MAX_TOKENS = int(os.getenv("CLAUDE_MAX_TOKENS", "8192"))
+CLAUDE_CONTEXT_WINDOWS = {
+    "claude-3-5-haiku-latest": 200000,
+    "claude-3-5-sonnet-latest": 200000,
+    "claude-3-7-sonnet-latest": 200000,
+    "claude-sonnet-4-0": 200000,
+}
+DEFAULT_CONTEXT_WINDOW = 200000
+
+# Shortest prompt prefix each model caches (tokens); shorter prompts are sent without cache_control
+CLAUDE_MIN_CACHEABLE_TOKENS = {
+    "claude-3-5-haiku-latest": 2048,
+}
+DEFAULT_MIN_CACHEABLE_TOKENS = 1024
+CONTEXT_SAFETY_MARGIN = 2000
+
+# Target transcript tokens per Map chunk (lowered further if the context window is smaller)
+CLAUDE_CHUNK_TOKENS = int(os.getenv("CLAUDE_CHUNK_TOKENS", "20000"))
+
+# Token counting: "local" (CJK-aware estimate) or "api" (count_tokens endpoint, cached per transcript)
+TOKEN_COUNTER = os.getenv("TOKEN_COUNTER", "local")
+
+# Chunks of one long transcript summarized concurrently in the Map phase
+CLAUDE_MAP_CONCURRENCY = int(os.getenv("CLAUDE_MAP_CONCURRENCY", "5"))
+
+# Summaries combined per Reduce call; more are reduced in a tree, level by level
+REDUCE_FAN_IN = max(2, int(os.getenv("REDUCE_FAN_IN", "8")))
+
+# Seconds of decoded audio between transcription checkpoint writes
+TRANSCRIPT_CHECKPOINT_SECONDS = int(os.getenv("TRANSCRIPT_CHECKPOINT_SECONDS", "120"))
+
+# Per-channel / per-show detected language, so later episodes skip Whisper's language detection
+LANGUAGE_CACHE_FILE = CACHE_DIR / "language_cache.json"
+LANGUAGE_CACHE_MIN_PROBABILITY = 0.8
+_language_cache_lock = threading.Lock()
+
+# Append-only history of per-transcription performance (one JSON object per line)
+TRANSCRIPTION_METRICS_FILE = CACHE_DIR / "transcription_metrics.jsonl"
+MIN_SAMPLES_FOR_MEASURED_SPEED = 5
+_transcription_metrics = None  # loaded lazily from TRANSCRIPTION_METRICS_FILE
+_transcription_metrics_lock = threading.Lock()
+
+# Append-only history of Claude calls: tokens incl. prompt cache reads / writes, latency
+CLAUDE_USAGE_FILE = CACHE_DIR / "claude_usage.jsonl"
+_claude_usage = None  # loaded lazily from CLAUDE_USAGE_FILE
+_claude_usage_lock = threading.Lock()
+
 def get_cache_key(url: str) -> str:
     """Generate cache key from URL"""
     return hashlib.md5(url.encode()).hexdigest()
@@ -65,6 +153,92 @@ def get_cached_result(url: str) -> Optional[dict]:
     print(f"❌ Cache MISS for URL: {url[:50]}...")
     return None
 
+# Shared outbound HTTP layer: keep-alive pools per host, retries with jittered backoff
+HTTP_USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+HTTP_DEFAULT_TIMEOUT = 10
+HTTP_HOST_TIMEOUTS = {
+    "itunes.apple.com": 5,
+    "mis.twse.com.tw": 5,
+    "podcasts.apple.com": 15,
+}
+HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "10"))
+
+def create_http_session() -> requests.Session:
+    """Session whose adapters keep connections alive and retry 429/5xx with jittered backoff"""
+    retry = Retry(
+        total=3,
+        backoff_factor=0.5,
+        backoff_jitter=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=20, pool_maxsize=HTTP_POOL_MAXSIZE, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers['User-Agent'] = HTTP_USER_AGENT
+    return session
+
+http_session = create_http_session()
+_http_errors = {}  # host -> failed request count
+_http_errors_lock = threading.Lock()
+
+def http_get(url: str, timeout: Optional[float] = None, **kwargs) -> requests.Response:
+    """GET through the shared session with the per-host timeout"""
+    host = urlparse(url).hostname
+    try:
+        return http_session.get(url, timeout=timeout or HTTP_HOST_TIMEOUTS.get(host, HTTP_DEFAULT_TIMEOUT), **kwargs)
+    except requests.RequestException:
+        with _http_errors_lock:
+            _http_errors[host] = _http_errors.get(host, 0) + 1
+        raise
+
+def get_http_pool_stats() -> dict:
+    """Per-host connection reuse: requests sent vs. new connections opened"""
+    stats = {}
+    for adapter in {id(a): a for a in http_session.adapters.values()}.values():
+        pools = adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            host_stats = stats.setdefault(pool.host, {"requests": 0, "connections_opened": 0})
+            host_stats["requests"] += pool.num_requests
+            host_stats["connections_opened"] += pool.num_connections
+    for host, host_stats in stats.items():
+        requests_sent = host_stats["requests"]
+        host_stats["reuse_ratio"] = round(1 - host_stats["connections_opened"] / requests_sent, 3) if requests_sent else None
+        host_stats["errors"] = _http_errors.get(host, 0)
+    return stats
+
+# Podcast show -> RSS feed resolution (the lookup URL can point at a local stand-in)
+ITUNES_LOOKUP_URL = os.getenv("ITUNES_LOOKUP_URL", "https://itunes.apple.com/lookup")
+PODCAST_FEEDS_FILE = CACHE_DIR / "podcast_feeds.json"
+_podcast_feeds_lock = threading.Lock()
+# Seconds before a feed GUID that Apple did not list is looked up again (new, bonus or premium episodes)
+APPLE_EPISODE_LOOKUP_RETRY = int(os.getenv("APPLE_EPISODE_LOOKUP_RETRY", "3600"))
+
+# ETag / Last-Modified validators plus the parsed listing, per feed / show page URL
+HTTP_VALIDATORS_FILE = CACHE_DIR / "http_validators.json"
+_http_validators_lock = threading.Lock()
+MAX_LISTING_EPISODES = 50
+
+# YouTube channel listing via the channel Atom feed (15 newest entries)
+YOUTUBE_CHANNELS_FILE = CACHE_DIR / "youtube_channels.json"
+YOUTUBE_FEED_WINDOW = 15
+CHANNEL_LISTING_TTL = int(os.getenv("CHANNEL_LISTING_TTL", "300"))
+_youtube_channels_lock = threading.Lock()
+_channel_listing_cache = {}  # channel_url -> {"videos", "fetched_at"}
+
+# In-memory per-show episode index (short TTL, stale-while-revalidate, one fetch per show at a time)
+SHOW_INDEX_TTL = int(os.getenv("SHOW_INDEX_TTL", "120"))
+SHOW_INDEX_STALE_TTL = SHOW_INDEX_TTL * 10
+_show_index = {}  # podcast_url -> {"episodes", "fetched_at", "refreshing"}
+_show_index_fetch_locks = {}
+_show_index_lock = threading.Lock()
+
 def save_to_cache(url: str, result: dict):
     """Save result to cache"""
     cache_key = get_cache_key(url)
@@ -82,30 +256,380 @@ def save_to_cache(url: str, result: dict):
     except Exception as e:
         print(f"⚠️ Cache write error: {e}")
 
-def get_latest_episode_url(podcast_url: str) -> str:
-    """Get the latest episode URL from an Apple Podcasts show page"""
+def write_json_atomic(path: Path, data: dict):
+    """Write JSON via a temp file so a crash never leaves a half-written cache file"""
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+def get_show_id(podcast_url: str) -> Optional[str]:
+    """Apple Podcasts show id from a show or episode URL"""
+    match = re.search(r'/id(\d+)', podcast_url)
+    return match.group(1) if match else None
+
+def apple_episode_url(show_id: str, episode_id) -> str:
+    """Canonical Apple Podcasts episode page URL, the same whichever listing it came from"""
+    return f"https://podcasts.apple.com/podcast/id{show_id}?i={episode_id}"
+
+def load_podcast_feeds() -> dict:
+    """Read the show id -> feed / episode id map (caller holds _podcast_feeds_lock)"""
+    if not PODCAST_FEEDS_FILE.exists():
+        return {}
     try:
-        print(f"🔍 Fetching latest episode from: {podcast_url}")
+        with open(PODCAST_FEEDS_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"⚠️ Feed map read error: {e}")
+        return {}
+
+def resolve_podcast_feed_url(podcast_url: str) -> Optional[str]:
+    """Resolve an Apple Podcasts show URL to its RSS feed via iTunes lookup (cached)"""
+    show_id = get_show_id(podcast_url)
+    if not show_id:
+        return None
+    
+    with _podcast_feeds_lock:
+        feeds = load_podcast_feeds()
+        if feeds.get(show_id, {}).get("feed_url"):
+            return feeds[show_id]["feed_url"]
         
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-        }
-        response = requests.get(podcast_url, headers=headers, timeout=10)
-        response.encoding = 'utf-8'  # Force UTF-8 encoding
+        try:
+            print(f"🔍 Looking up RSS feed for show id {show_id}")
+            response = http_get(ITUNES_LOOKUP_URL, params={"id": show_id, "entity": "podcast"})
+            response.raise_for_status()
+            results = response.json().get("results", [])
+            feed_url = next((r["feedUrl"] for r in results if r.get("feedUrl")), None)
+        except Exception as e:
+            print(f"⚠️ iTunes lookup failed: {e}")
+            return None
+        
+        if not feed_url:
+            print(f"⚠️ No RSS feed listed for show id {show_id}")
+            return None
+        
+        feeds.setdefault(show_id, {}).update({
+            "feed_url": feed_url,
+            "show_url": podcast_url,
+            "resolved_at": datetime.now().isoformat()
+        })
+        try:
+            write_json_atomic(PODCAST_FEEDS_FILE, feeds)
+        except Exception as e:
+            print(f"⚠️ Feed map write error: {e}")
+        print(f"✅ Resolved RSS feed: {feed_url}")
+        return feed_url
+
+def lookup_apple_episode_ids(show_id: str, episodes: List[dict]) -> dict:
+    """
+    Map feed GUIDs to Apple episode ids via iTunes lookup (cached per show).
+    
+    Only unmapped GUIDs trigger a lookup, and one that Apple did not list is
+    retried at most every APPLE_EPISODE_LOOKUP_RETRY seconds, so feed items
+    Apple never lists do not cost an upstream call on every listing. The
+    lookup itself runs outside _podcast_feeds_lock.
+    """
+    now = time.time()
+    with _podcast_feeds_lock:
+        show = load_podcast_feeds().get(show_id, {})
+        episode_ids = show.get("episode_ids", {})
+        misses = show.get("lookup_misses", {})
+        due = [
+            episode for episode in episodes
+            if episode['guid'] not in episode_ids and now - misses.get(episode['guid'], 0) >= APPLE_EPISODE_LOOKUP_RETRY
+        ]
+    if not due:
+        return episode_ids
+    
+    results = []
+    try:
+        print(f"🔍 Looking up Apple episode ids for show id {show_id} ({len(due)} unmapped)")
+        response = http_get(ITUNES_LOOKUP_URL, params={
+            "id": show_id, "entity": "podcastEpisode", "limit": MAX_LISTING_EPISODES
+        })
         response.raise_for_status()
+        results = response.json().get("results", [])
+    except Exception as e:
+        print(f"⚠️ iTunes episode lookup failed: {e}")
+    
+    by_enclosure = {r["episodeUrl"]: r["trackId"] for r in results if r.get("episodeUrl") and r.get("trackId")}
+    by_guid = {r["episodeGuid"]: r["trackId"] for r in results if r.get("episodeGuid") and r.get("trackId")}
+    with _podcast_feeds_lock:
+        feeds = load_podcast_feeds()
+        show = feeds.setdefault(show_id, {})
+        episode_ids = show.setdefault("episode_ids", {})
+        misses = show.setdefault("lookup_misses", {})
+        for episode in due:
+            episode_id = by_guid.get(episode['guid']) or by_enclosure.get(episode['enclosure_url'])
+            if episode_id:
+                episode_ids[episode['guid']] = str(episode_id)
+                misses.pop(episode['guid'], None)
+            else:
+                misses[episode['guid']] = now
+        try:
+            write_json_atomic(PODCAST_FEEDS_FILE, feeds)
+        except Exception as e:
+            print(f"⚠️ Feed map write error: {e}")
+        return episode_ids
+
+def parse_itunes_duration(value) -> Optional[int]:
+    """Parse itunes:duration ("3600", "59:59", "1:02:03") into seconds"""
+    if not value:
+        return None
+    try:
+        seconds = 0
+        for part in str(value).strip().split(':'):
+            seconds = seconds * 60 + int(float(part))
+        return seconds
+    except ValueError:
+        return None
+
+def fetch_listing(url: str, parse, headers: Optional[dict] = None) -> tuple:
+    """
+    Fetch and parse a listing (feed / show page) with conditional revalidation.
+    
+    ETag / Last-Modified validators and the parsed listing are kept per URL;
+    a 304 returns the stored listing without downloading or parsing the page.
+    
+    Returns (listing, changed).
+    """
+    with _http_validators_lock:
+        validators = {}
+        if HTTP_VALIDATORS_FILE.exists():
+            try:
+                with open(HTTP_VALIDATORS_FILE, 'r', encoding='utf-8') as f:
+                    validators = json.load(f)
+            except Exception as e:
+                print(f"⚠️ Validator store read error: {e}")
+        entry = validators.get(url)
+    
+    request_headers = dict(headers or {})
+    if entry:
+        if entry.get("etag"):
+            request_headers['If-None-Match'] = entry["etag"]
+        if entry.get("last_modified"):
+            request_headers['If-Modified-Since'] = entry["last_modified"]
+    
+    response = http_get(url, headers=request_headers)
+    if response.status_code == 304 and entry:
+        print(f"✅ 304 Not Modified: {url[:60]}")
+        return entry["listing"], False
+    response.raise_for_status()
+    
+    listing = parse(response)
+    etag = response.headers.get('ETag')
+    last_modified = response.headers.get('Last-Modified')
+    if etag or last_modified:
+        with _http_validators_lock:
+            try:
+                validators = {}
+                if HTTP_VALIDATORS_FILE.exists():
+                    with open(HTTP_VALIDATORS_FILE, 'r', encoding='utf-8') as f:
+                        validators = json.load(f)
+                validators[url] = {
+                    "etag": etag,
+                    "last_modified": last_modified,
+                    "fetched_at": datetime.now().isoformat(),
+                    "listing": listing
+                }
+                write_json_atomic(HTTP_VALIDATORS_FILE, validators)
+            except Exception as e:
+                print(f"⚠️ Validator store write error: {e}")
+    return listing, True
+
+def parse_feed_episodes(response) -> List[dict]:
+    """Parse a podcast RSS feed response into episode dicts, newest first"""
+    feed = feedparser.parse(response.content)
+    
+    entries = [e for e in feed.entries if e.get('enclosures')]
+    entries.sort(key=lambda e: tuple(e.get('published_parsed') or ()), reverse=True)
+    
+    episodes = []
+    for entry in entries[:MAX_LISTING_EPISODES]:
+        enclosure_url = entry.enclosures[0].get('href')
+        guid = entry.get('id') or enclosure_url
+        published = entry.get('published_parsed')
+        episodes.append({
+            'title': entry.get('title', 'Untitled'),
+            'url': enclosure_url,  # replaced by the Apple episode page once the GUID is mapped
+            'guid': guid,
+            'published': datetime(*published[:6]).isoformat() if published else None,
+            'duration': parse_itunes_duration(entry.get('itunes_duration')),
+            'enclosure_url': enclosure_url,
+            'link': entry.get('link')
+        })
+    return episodes
+
+def get_feed_episodes(feed_url: str, max_episodes: int = 5) -> List[dict]:
+    """List recent episodes from a podcast RSS feed, newest first"""
+    episodes, _ = fetch_listing(feed_url, parse_feed_episodes)
+    return episodes[:max_episodes]
+
+APPLE_EPISODE_HREF = re.compile(r'/podcast/[^/]+/id\d+\?i=\d+')
+APPLE_PAGE_PARSER = os.getenv("APPLE_PAGE_PARSER", "lxml")  # "lxml" or "bs4"
+
+def _collect_apple_episodes(links) -> List[dict]:
+    """Normalise and deduplicate (href, title) pairs in page order"""
+    episodes = []
+    seen_urls = set()
+    
+    for url, title in links:
+        if not url.startswith('http'):
+            url = 'https://podcasts.apple.com' + url
+        match = re.search(r'/id(\d+)\?i=(\d+)', url)
+        if match:
+            url = apple_episode_url(match.group(1), match.group(2))
         
-        soup = BeautifulSoup(response.text, 'html.parser')
-        episode_links = soup.find_all('a', href=re.compile(r'/podcast/[^/]+/id\d+\?i=\d+'))
+        if url in seen_urls:
+            continue
+        seen_urls.add(url)
         
-        if not episode_links:
-            raise ValueError("No episodes found on the podcast page")
+        episodes.append({
+            'title': title,
+            'url': url
+        })
         
-        latest_episode_url = episode_links[0]['href']
-        if not latest_episode_url.startswith('http'):
-            latest_episode_url = 'https://podcasts.apple.com' + latest_episode_url
+        if len(episodes) >= MAX_LISTING_EPISODES:
+            break
+    return episodes
+
+def extract_apple_episodes_bs4(html: str) -> List[dict]:
+    """Episode links via a full BeautifulSoup DOM (reference parser)"""
+    soup = BeautifulSoup(html, 'html.parser')
+    episode_links = soup.find_all('a', href=APPLE_EPISODE_HREF)
+    return _collect_apple_episodes((link['href'], link.get_text(strip=True)) for link in episode_links)
+
+def extract_apple_episodes_lxml(html: str) -> List[dict]:
+    """
+    Episode links via lxml's C parser, visiting only anchors with an episode
+    href; falls back to the page's JSON-LD episode data when no anchors match.
+    """
+    tree = lxml.html.fromstring(html)
+    links = []
+    for anchor in tree.iter('a'):
+        href = anchor.get('href')
+        if href and APPLE_EPISODE_HREF.search(href):
+            links.append((href, ''.join(part.strip() for part in anchor.itertext())))
+    if links:
+        return _collect_apple_episodes(links)
+    
+    for script in tree.iter('script'):
+        if script.get('type') != 'application/ld+json' or not script.text:
+            continue
+        try:
+            data = json.loads(script.text)
+        except json.JSONDecodeError:
+            continue
+        items = data if isinstance(data, list) else data.get('@graph', data.get('workExample', [data]))
+        for item in items if isinstance(items, list) else [items]:
+            if isinstance(item, dict) and item.get('@type') == 'PodcastEpisode' and item.get('url'):
+                links.append((item['url'], item.get('name', '')))
+    return _collect_apple_episodes(links)
+
+def parse_apple_show_page(response) -> List[dict]:
+    """Parse episode links (title + URL, deduplicated, page order) from an Apple Podcasts show page"""
+    response.encoding = 'utf-8'  # Force UTF-8 encoding
+    if APPLE_PAGE_PARSER == "lxml":
+        try:
+            return extract_apple_episodes_lxml(response.text)
+        except Exception as e:
+            print(f"⚠️ lxml parse failed, falling back to BeautifulSoup: {e}")
+    return extract_apple_episodes_bs4(response.text)
+
+def get_show_page_episodes(podcast_url: str) -> List[dict]:
+    """Scrape episode links from an Apple Podcasts show page"""
+    episodes, _ = fetch_listing(podcast_url, parse_apple_show_page)
+    if not episodes:
+        raise ValueError("No episodes found on the podcast page")
+    return episodes
+
+def fetch_show_episodes(podcast_url: str) -> List[dict]:
+    """
+    List a show's recent episodes from its RSS feed, scraping the show page as fallback.
+    
+    Either way an episode's 'url' is its Apple episode page (the enclosure URL
+    until Apple has indexed it), so listings compare equal across both sources;
+    feed episodes are downloaded from 'enclosure_url'.
+    """
+    show_id = get_show_id(podcast_url)
+    feed_url = resolve_podcast_feed_url(podcast_url)
+    if feed_url:
+        try:
+            episodes = get_feed_episodes(feed_url, MAX_LISTING_EPISODES)
+            if episodes:
+                print(f"✅ Found {len(episodes)} episodes via RSS")
+                episode_ids = lookup_apple_episode_ids(show_id, episodes)
+                return [
+                    dict(episode, show_id=show_id, episode_id=episode_ids[episode['guid']],
+                         url=apple_episode_url(show_id, episode_ids[episode['guid']]))
+                    if episode['guid'] in episode_ids else dict(episode, show_id=show_id)
+                    for episode in episodes
+                ]
+        except Exception as e:
+            print(f"⚠️ RSS feed read failed, falling back to show page: {e}")
+    
+    print(f"🔍 Fetching episodes from: {podcast_url}")
+    episodes = get_show_page_episodes(podcast_url)
+    print(f"✅ Found {len(episodes)} episodes")
+    return [dict(episode, show_id=show_id) for episode in episodes]
+
+def _refresh_show_index(podcast_url: str) -> List[dict]:
+    """Fetch a show's episodes into the index; concurrent callers share one upstream fetch"""
+    with _show_index_lock:
+        fetch_lock = _show_index_fetch_locks.setdefault(podcast_url, threading.Lock())
+        requested_at = time.time()
+    
+    with fetch_lock:
+        entry = _show_index.get(podcast_url)
+        if entry and entry["fetched_at"] >= requested_at:
+            return entry["episodes"]  # Another caller fetched while we waited
+        try:
+            episodes = fetch_show_episodes(podcast_url)
+        finally:
+            if entry:
+                entry["refreshing"] = False
+        _show_index[podcast_url] = {"episodes": episodes, "fetched_at": time.time(), "refreshing": False}
+        return episodes
+
+def _background_refresh_show_index(podcast_url: str):
+    try:
+        _refresh_show_index(podcast_url)
+    except Exception as e:
+        print(f"⚠️ Background show index refresh failed: {e}")
+
+def get_show_index(podcast_url: str, refresh: bool = False) -> List[dict]:
+    """
+    Per-show episode index shared by /apple_podcast/latest, /apple_podcast/summary
+    and the subscription poller.
+    
+    Fresh entries (< SHOW_INDEX_TTL) are served directly; moderately stale ones
+    are served while a background refresh runs; anything older, or refresh=True,
+    fetches synchronously.
+    """
+    entry = _show_index.get(podcast_url)
+    if entry and not refresh:
+        age = time.time() - entry["fetched_at"]
+        if age < SHOW_INDEX_TTL:
+            return entry["episodes"]
+        if age < SHOW_INDEX_STALE_TTL:
+            with _show_index_lock:
+                start_refresh = not entry["refreshing"]
+                entry["refreshing"] = True
+            if start_refresh:
+                threading.Thread(target=_background_refresh_show_index, args=(podcast_url,), daemon=True).start()
+            return entry["episodes"]
+    return _refresh_show_index(podcast_url)
+
+def get_latest_episode(podcast_url: str) -> dict:
+    """Get the latest episode (title, page URL, enclosure) from an Apple Podcasts show"""
+    try:
+        episodes = get_show_index(podcast_url)
+        if not episodes:
+            raise ValueError("No episodes found for the podcast")
+        latest_episode = episodes[0]
             
-        print(f"✅ Found latest episode: {latest_episode_url}")
-        return latest_episode_url
+        print(f"✅ Found latest episode: {latest_episode['url']}")
+        return latest_episode
         
     except Exception as e:
         print(f"❌ Error fetching latest episode: {e}")
@@ -114,54 +638,111 @@ def get_latest_episode_url(podcast_url: str) -> str:
             detail=f"Failed to fetch latest episode: {str(e)}"
         )
 
-def get_podcast_episodes(podcast_url: str, max_episodes: int = 5) -> List[dict]:
-    """Get recent episodes from an Apple Podcasts show page"""
+def get_podcast_episodes(podcast_url: str, max_episodes: int = 5, refresh: bool = False) -> List[dict]:
+    """Get recent episodes from an Apple Podcasts show"""
     try:
-        print(f"🔍 Fetching episodes from: {podcast_url}")
-        
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-        }
-        response = requests.get(podcast_url, headers=headers, timeout=10)
-        response.encoding = 'utf-8'  # Force UTF-8 encoding
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.text, 'html.parser')
-        episode_links = soup.find_all('a', href=re.compile(r'/podcast/[^/]+/id\d+\?i=\d+'))
-        
-        if not episode_links:
-            raise ValueError("No episodes found on the podcast page")
-            
-        episodes = []
-        seen_urls = set()
-        
-        for link in episode_links:
-            url = link['href']
-            if not url.startswith('http'):
-                url = 'https://podcasts.apple.com' + url
-            
-            if url in seen_urls:
-                continue
-            seen_urls.add(url)
-            
-            title = link.get_text(strip=True)
-            episodes.append({
-                'title': title,
-                'url': url
-            })
-            
-            if len(episodes) >= max_episodes:
-                break
-                
-        print(f"✅ Found {len(episodes)} episodes")
+        episodes = get_show_index(podcast_url, refresh=refresh)[:max_episodes]
+        print(f"📋 Using {len(episodes)} episodes from show index")
         return episodes
         
     except Exception as e:
         print(f"❌ Error fetching podcast episodes: {e}")
         raise HTTPException(status_code=400, detail=f"Failed to fetch episodes: {str(e)}")
 
-def get_channel_videos(channel_url: str, max_videos: int = 5) -> List[dict]:
-    """Get recent videos from a YouTube channel"""
+def resolve_youtube_channel_id(channel_url: str) -> Optional[str]:
+    """Resolve a channel URL (@handle, /c/, /channel/) to its UC... id (cached)"""
+    match = re.search(r'/channel/(UC[\w-]{22})', channel_url)
+    if match:
+        return match.group(1)
+    
+    base_url = re.sub(r'/(videos|streams|shorts|featured|playlists)/?$', '', channel_url.rstrip('/'))
+    with _youtube_channels_lock:
+        channels = {}
+        if YOUTUBE_CHANNELS_FILE.exists():
+            try:
+                with open(YOUTUBE_CHANNELS_FILE, 'r', encoding='utf-8') as f:
+                    channels = json.load(f)
+            except Exception as e:
+                print(f"⚠️ Channel map read error: {e}")
+        if base_url in channels:
+            return channels[base_url]["channel_id"]
+        
+        channel_id = None
+        try:
+            response = http_get(base_url)
+            response.raise_for_status()
+            match = (re.search(r'<link rel="canonical" href="https://www\.youtube\.com/channel/(UC[\w-]{22})"', response.text)
+                     or re.search(r'"externalId":"(UC[\w-]{22})"', response.text)
+                     or re.search(r'"channelId":"(UC[\w-]{22})"', response.text))
+            channel_id = match.group(1) if match else None
+        except Exception as e:
+            print(f"⚠️ Channel page fetch failed: {e}")
+        
+        if not channel_id:
+            print(f"⚠️ Could not resolve channel id for {base_url}")
+            return None
+        
+        channels[base_url] = {"channel_id": channel_id, "resolved_at": datetime.now().isoformat()}
+        try:
+            write_json_atomic(YOUTUBE_CHANNELS_FILE, channels)
+        except Exception as e:
+            print(f"⚠️ Channel map write error: {e}")
+        print(f"✅ Resolved channel id: {channel_id}")
+        return channel_id
+
+def get_channel_feed_url(channel_url: str, channel_id: str) -> str:
+    """Atom feed for the channel, narrowed to the tab in the URL via its uploads playlists"""
+    tab = re.search(r'/(videos|streams|shorts)/?$', channel_url.rstrip('/') + '/')
+    playlist_prefix = {"videos": "UULF", "streams": "UULV", "shorts": "UUSH"}.get(tab.group(1)) if tab else None
+    if playlist_prefix:
+        return f"https://www.youtube.com/feeds/videos.xml?playlist_id={playlist_prefix}{channel_id[2:]}"
+    return f"https://www.youtube.com/feeds/videos.xml?channel_id={channel_id}"
+
+def parse_channel_feed(response) -> List[dict]:
+    """Parse a YouTube channel Atom feed response into video dicts, newest first"""
+    feed = feedparser.parse(response.content)
+    videos = []
+    for entry in feed.entries:
+        video_id = entry.get('yt_videoid')
+        if not video_id:
+            continue
+        videos.append({
+            'title': entry.get('title', 'Untitled'),
+            'url': f"https://www.youtube.com/watch?v={video_id}",
+            'video_id': video_id,
+            'published': entry.get('published')
+        })
+    return videos
+
+def get_channel_videos(channel_url: str, max_videos: int = 5, refresh: bool = False) -> List[dict]:
+    """
+    Get recent videos from a YouTube channel.
+    
+    Reads the channel's Atom feed (conditional request, CHANNEL_LISTING_TTL
+    in-memory cache); yt-dlp is only used when more videos than the feed
+    window are requested or the feed is unavailable.
+    """
+    if max_videos <= YOUTUBE_FEED_WINDOW:
+        cached = _channel_listing_cache.get(channel_url)
+        if cached and not refresh and time.time() - cached["fetched_at"] < CHANNEL_LISTING_TTL:
+            print(f"✅ Channel listing cache HIT: {channel_url[:50]}")
+            return cached["videos"][:max_videos]
+        
+        channel_id = resolve_youtube_channel_id(channel_url)
+        if channel_id:
+            try:
+                videos, _ = fetch_listing(get_channel_feed_url(channel_url, channel_id), parse_channel_feed)
+                if videos:
+                    _channel_listing_cache[channel_url] = {"videos": videos, "fetched_at": time.time()}
+                    print(f"✅ Found {len(videos)} videos via channel feed")
+                    return videos[:max_videos]
+            except Exception as e:
+                print(f"⚠️ Channel feed read failed, falling back to yt-dlp: {e}")
+    
+    return get_channel_videos_ytdlp(channel_url, max_videos)
+
+def get_channel_videos_ytdlp(channel_url: str, max_videos: int = 5) -> List[dict]:
+    """Get recent videos from a YouTube channel with a yt-dlp flat playlist extraction"""
     try:
         print(f"🔍 Fetching videos from channel: {channel_url}")
         
@@ -218,17 +799,349 @@ def split_text(text: str, max_chunk_size: int = 25000) -> List[str]:
         chunks.append('\n'.join(current_chunk))
     return chunks
 
-def summarize_with_claude(content: str, prompt: str = None) -> str:
+# Segment markers in transcript text: "[123]" / "[12.5]" (raw seconds) or "[02:03]" / "[01:02:03]"
+TRANSCRIPT_SEGMENT_MARKER = re.compile(r'\[(?:\d+:)*\d+(?:\.\d+)?\] ')
+
+# Tokens of the previous chunk's tail repeated at the start of the next chunk
+TRANSCRIPT_CHUNK_OVERLAP = int(os.getenv("TRANSCRIPT_CHUNK_OVERLAP", "500"))
+
+# Compaction of transcripts before summarization: filler words, stutter repeats, dense timestamps
+TRANSCRIPT_COMPACTION = os.getenv("TRANSCRIPT_COMPACTION", "1") == "1"
+COMPACTION_REMOVE_FILLERS = os.getenv("COMPACTION_REMOVE_FILLERS", "1") == "1"
+COMPACTION_COLLAPSE_REPEATS = os.getenv("COMPACTION_COLLAPSE_REPEATS", "1") == "1"
+COMPACTION_TIMESTAMP_SECONDS = int(os.getenv("COMPACTION_TIMESTAMP_SECONDS", "30"))  # 0 keeps every marker
+
+# Hesitation sounds only; words like 然後 / 就是 / 那個 often carry meaning and are kept.
+# English fillers must stand alone, so "uh-huh" and words containing "um" are left intact
+FILLER_WORDS = re.compile(
+    r'(?:(?:嗯+|呃+|欸+|誒+)|(?<![A-Za-z0-9_-])(?:u+m+|u+h+|e+r+m+|u+h+m+)(?![A-Za-z0-9_-]))[，,、。… \t]*',
+    re.IGNORECASE
+)
+# Only runs of 3+ are stutters; doubled forms are usually words (謝謝, 天天, 研究研究, 一個一個, that that):
+# "對對對對" -> "對對", "我覺得我覺得我覺得" -> "我覺得", "the the the" -> "the";
+# numbers (digits and CJK numerals, 三三三號) are never touched
+CJK_NUMERALS = "〇一二三四五六七八九十百千萬億兩"
+REPEATED_CJK_CHAR = re.compile(rf'((?![{CJK_NUMERALS}])[\u4e00-\u9fff])(?:[，,、 ]?\1){{2,}}')
+REPEATED_CJK_PHRASE = re.compile(r'([\u4e00-\u9fff]{2,6})(?:[，,、 ]?\1){2,}')
+REPEATED_WORD = re.compile(r'\b([A-Za-z]+)(?:\s+\1\b){2,}', re.IGNORECASE)
+
+def split_transcript_units(text: str) -> List[tuple]:
     """
-    Summarize content using Claude AI with Map-Reduce support for long content.
+    Cut text at line breaks and [ts] segment markers.
+    
+    Returns (unit, new_item) pairs whose units concatenate back to text;
+    new_item marks the first unit after a blank line, i.e. the start of the
+    next video / episode block in combined channel content.
     """
-    if not anthropic_client:
-        raise HTTPException(
-            status_code=503,
-            detail="AI summarization not available - ANTHROPIC_API_KEY not configured"
+    cuts = {0, len(text)}
+    cuts.update(match.end() for match in re.finditer(r'\n', text))
+    cuts.update(match.start() for match in TRANSCRIPT_SEGMENT_MARKER.finditer(text))
+    cuts = sorted(cuts)
+    
+    units = []
+    for start, end in zip(cuts, cuts[1:]):
+        new_item = start >= 2 and text[start - 2:start] == "\n\n"
+        units.append((text[start:end], new_item))
+    return units
+
+def split_oversized_unit(unit: str, max_size: int, measure=len) -> List[str]:
+    """
+    Cut a unit larger than max_size into pieces measuring at most max_size:
+    each piece is the longest prefix of the rest that fits (binary search, as
+    measure grows with the text), so mixed ASCII / CJK text cannot overshoot.
+    """
+    pieces = []
+    start = 0
+    while start < len(unit):
+        low, high = 1, len(unit) - start
+        while low < high:
+            middle = (low + high + 1) // 2
+            if measure(unit[start:start + middle]) <= max_size:
+                low = middle
+            else:
+                high = middle - 1
+        pieces.append(unit[start:start + low])
+        start += low
+    return pieces
+
+def is_chunk_anchor(segment: str, size: float, anchor_span: float) -> bool:
+    """Content-defined boundary test: the segment's hash falls under a threshold proportional to its size"""
+    return zlib.crc32(segment.encode()) < min(1.0, size / anchor_span) * 2**32
+
+def split_transcript(text: str, max_chunk_size: int = 25000, overlap: int = TRANSCRIPT_CHUNK_OVERLAP, measure=len) -> List[str]:
+    """
+    Split a transcript into chunks of at most max_chunk_size, as measured by
+    measure (characters by default, e.g. estimate_tokens for token budgets).
+    
+    Chunks end on [ts] segment or video / episode boundaries; a single segment
+    larger than the limit is cut by size. Each chunk starts with up to overlap
+    (same unit) of whole segments from the end of the previous chunk, unless
+    the chunk starts a new video / episode.
+    
+    Boundaries are content-defined: once a chunk is half the limit, it ends
+    before the next video / episode or after a segment picked by
+    is_chunk_anchor. That choice depends only on the segment itself, so an
+    edit early in a transcript (a corrected caption, an extra episode) only
+    moves nearby boundaries and later chunks keep their chunk cache entries.
+    """
+    overlap = min(overlap, max_chunk_size // 2)
+    min_size = max_chunk_size // 2
+    anchor_span = max(1, (max_chunk_size - min_size) / 3)  # expected size past min_size until an anchor
+    chunks = []
+    current = []  # (unit, size) of the chunk being built
+    current_length = 0
+    fresh = 0  # units in current that were not carried over as overlap
+    
+    def cut(carry: bool):
+        nonlocal current, current_length, fresh
+        chunks.append("".join(part for part, _ in current))
+        # Carry whole trailing segments into the next chunk as overlap
+        carried = []
+        carried_length = 0
+        if carry:
+            for previous, previous_size in reversed(current):
+                if carried_length + previous_size > overlap:
+                    break
+                carried.insert(0, (previous, previous_size))
+                carried_length += previous_size
+        current, current_length, fresh = carried, carried_length, 0
+    
+    for unit, new_item in split_transcript_units(text):
+        size = measure(unit)
+        pieces = split_oversized_unit(unit, max_chunk_size, measure) if size > max_chunk_size else [unit]
+        for piece in pieces:
+            piece_size = size if len(pieces) == 1 else measure(piece)
+            if fresh and new_item and current_length >= min_size:
+                cut(carry=False)
+            elif fresh and current_length + piece_size > max_chunk_size:
+                cut(carry=not new_item)
+            # Overlap must leave room for the new segment
+            while current and current_length + piece_size > max_chunk_size:
+                current_length -= current.pop(0)[1]
+            
+            current.append((piece, piece_size))
+            current_length += piece_size
+            fresh += 1
+            new_item = False
+            if current_length >= min_size and is_chunk_anchor(piece, piece_size, anchor_span):
+                cut(carry=True)
+    
+    if fresh:
+        chunks.append("".join(part for part, _ in current))
+    return [chunk.strip() for chunk in chunks if chunk.strip()]
+
+def parse_marker_seconds(marker: str) -> Optional[float]:
+    """Seconds of a segment marker such as [123], [12.5], [02:03] or [01:02:03]"""
+    try:
+        seconds = 0.0
+        for part in marker.strip()[1:-1].split(':'):
+            seconds = seconds * 60 + float(part)
+        return seconds
+    except ValueError:
+        return None
+
+def thin_timestamps(text: str, interval: int) -> str:
+    """Keep at most one segment marker per interval seconds; dropped markers' text joins the previous segment"""
+    last_kept = None
+    
+    def keep_or_drop(match):
+        nonlocal last_kept
+        seconds = parse_marker_seconds(match.group(0))
+        if seconds is None:
+            return match.group(0)
+        if last_kept is None or seconds < last_kept or seconds - last_kept >= interval:
+            last_kept = seconds  # (a smaller value starts the next video / episode)
+            return match.group(0)
+        return ""
+    
+    return TRANSCRIPT_SEGMENT_MARKER.sub(keep_or_drop, text)
+
+def compact_transcript(text: str) -> tuple:
+    """
+    Shrink a transcript before summarization: remove hesitation fillers,
+    collapse stuttered repeats and thin timestamps to one per
+    COMPACTION_TIMESTAMP_SECONDS. Returns (text, stats), stats being None when
+    TRANSCRIPT_COMPACTION is off.
+    """
+    if not TRANSCRIPT_COMPACTION:
+        return text, None
+    
+    compacted = text
+    if COMPACTION_REMOVE_FILLERS:
+        compacted = FILLER_WORDS.sub("", compacted)
+    if COMPACTION_COLLAPSE_REPEATS:
+        compacted = REPEATED_CJK_CHAR.sub(r"\1\1", compacted)
+        compacted = REPEATED_CJK_PHRASE.sub(
+            lambda match: match.group(0) if all(c in CJK_NUMERALS for c in match.group(1)) else match.group(1),
+            compacted
         )
+        compacted = REPEATED_WORD.sub(r"\1", compacted)
+    if COMPACTION_TIMESTAMP_SECONDS > 0:
+        compacted = thin_timestamps(compacted, COMPACTION_TIMESTAMP_SECONDS)
+    compacted = re.sub(r'[ \t]{2,}', ' ', compacted)
+    
+    tokens_before = estimate_tokens(text)
+    tokens_after = estimate_tokens(compacted)
+    stats = {
+        "chars_before": len(text),
+        "chars_after": len(compacted),
+        "chars_saved": len(text) - len(compacted),
+        "tokens_before": tokens_before,
+        "tokens_after": tokens_after,
+        "tokens_saved": tokens_before - tokens_after
+    }
+    print(f"🗜️ Compacted transcript: {stats['chars_saved']} chars / ~{stats['tokens_saved']} tokens saved "
+          f"({stats['chars_saved'] / max(1, len(text)):.0%})")
+    return compacted, stats
+
+# Han, kana, hangul and full-width forms; Claude spends roughly one token or more per character
+CJK_CHARACTERS = re.compile(r'[\u3000-\u303f\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff\uff00-\uffef]')
+CJK_TOKENS_PER_CHAR = 1.2
+OTHER_CHARS_PER_TOKEN = 3.5
+
+def estimate_tokens(text: str) -> int:
+    """Local token estimate: CJK characters count individually, other text by average token length"""
+    cjk = len(CJK_CHARACTERS.findall(text))
+    return int(cjk * CJK_TOKENS_PER_CHAR + (len(text) - cjk) / OTHER_CHARS_PER_TOKEN) + 1
+
+def count_transcript_tokens(text: str) -> int:
+    """
+    Input tokens of a transcript. With TOKEN_COUNTER=api the count_tokens
+    endpoint is used (ANTHROPIC_BASE_URL can point it at a stand-in server);
+    counts are cached per transcript, counter and model.
+    """
+    counter = "api" if TOKEN_COUNTER == "api" and anthropic_client else "local"
+    key = hashlib.md5(f"{counter}|{CLAUDE_MODEL}|{text}".encode()).hexdigest()
+    cache_file = CACHE_DIR / f"tokens_{key}.json"
+    
+    if cache_file.exists():
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                return json.load(f)['tokens']
+        except Exception as e:
+            print(f"⚠️ Token count cache read error: {e}")
     
-    default_prompt = """你是一個專門將 Podcast / YouTube 逐字稿轉成「投資整理＋重點摘要」的助手。  
+    tokens = None
+    if counter == "api":
+        try:
+            tokens = anthropic_client.messages.count_tokens(
+                model=CLAUDE_MODEL,
+                messages=[{"role": "user", "content": text}]
+            ).input_tokens
+        except Exception as e:
+            print(f"⚠️ count_tokens failed, using local estimate: {e}")
+            counter = "local"
+    if tokens is None:
+        tokens = estimate_tokens(text)
+    
+    try:
+        write_json_atomic(cache_file, {
+            'counter': counter,
+            'model': CLAUDE_MODEL,
+            'tokens': tokens,
+            'chars': len(text),
+            'cached_at': datetime.now().isoformat()
+        })
+    except Exception as e:
+        print(f"⚠️ Failed to cache token count: {e}")
+    return tokens
+
+def get_chunk_token_budget(prompt: str) -> int:
+    """Transcript tokens per chunk: CLAUDE_CHUNK_TOKENS, within what the model's context leaves after prompt and output"""
+    context_window = CLAUDE_CONTEXT_WINDOWS.get(CLAUDE_MODEL, DEFAULT_CONTEXT_WINDOW)
+    available = context_window - CLAUDE_MAX_TOKENS - estimate_tokens(prompt) - CONTEXT_SAFETY_MARGIN
+    return max(1000, min(CLAUDE_CHUNK_TOKENS, available))
+
+def is_prompt_cacheable(base_prompt: str) -> bool:
+    """Whether the base prompt reaches the model's minimum cacheable length (local estimate)"""
+    return estimate_tokens(base_prompt) >= CLAUDE_MIN_CACHEABLE_TOKENS.get(CLAUDE_MODEL, DEFAULT_MIN_CACHEABLE_TOKENS)
+
+def build_claude_request(base_prompt: str, text: str) -> dict:
+    """
+    Messages API arguments for one call. The base prompt is the system block,
+    marked for prompt caching when it is long enough for the model to cache.
+    """
+    system_block = {"type": "text", "text": base_prompt}
+    if is_prompt_cacheable(base_prompt):
+        system_block["cache_control"] = {"type": "ephemeral"}
+    return {
+        "model": CLAUDE_MODEL,
+        "max_tokens": CLAUDE_MAX_TOKENS,
+        "system": [system_block],
+        "messages": [
+            {"role": "user", "content": text}
+        ]
+    }
+
+def load_claude_usage() -> List[dict]:
+    """Return the Claude usage history, reading it from disk on first use"""
+    global _claude_usage
+    with _claude_usage_lock:
+        if _claude_usage is None:
+            _claude_usage = []
+            if CLAUDE_USAGE_FILE.exists():
+                with open(CLAUDE_USAGE_FILE, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        try:
+                            _claude_usage.append(json.loads(line))
+                        except json.JSONDecodeError:
+                            continue
+        return list(_claude_usage)
+
+def record_claude_usage(message, stage: str, elapsed: float):
+    """Append one Claude call's token usage (incl. prompt cache reads / writes) to the history"""
+    usage = message.usage
+    record = {
+        "recorded_at": datetime.now().isoformat(),
+        "model": CLAUDE_MODEL,
+        "stage": stage,
+        "seconds": round(elapsed, 3),
+        "input_tokens": usage.input_tokens,
+        "output_tokens": usage.output_tokens,
+        "cache_creation_input_tokens": getattr(usage, "cache_creation_input_tokens", None) or 0,
+        "cache_read_input_tokens": getattr(usage, "cache_read_input_tokens", None) or 0
+    }
+    load_claude_usage()
+    with _claude_usage_lock:
+        _claude_usage.append(record)
+        try:
+            with open(CLAUDE_USAGE_FILE, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record) + "\n")
+        except Exception as e:
+            print(f"⚠️ Usage write error: {e}")
+
+def call_claude_with_prompt(base_prompt: str, text: str, stage: str = "summary", on_text=None) -> str:
+    """
+    Single Claude call: base prompt (cached system block) then the text to process.
+    With on_text the response is streamed and on_text receives each text delta.
+    """
+    try:
+        start = time.time()
+        if on_text:
+            with anthropic_client.messages.stream(**build_claude_request(base_prompt, text)) as stream:
+                for delta in stream.text_stream:
+                    on_text(delta)
+                message = stream.get_final_message()
+        else:
+            message = anthropic_client.messages.create(**build_claude_request(base_prompt, text))
+        record_claude_usage(message, stage, time.time() - start)
+        return message.content[0].text
+    except Exception as e:
+        print(f"⚠️ Claude API error for chunk: {e}")
+        return f"[Error summarizing this chunk: {str(e)}]"
+
+async def call_claude_with_prompt_async(client, base_prompt: str, text: str, stage: str = "summary") -> str:
+    """call_claude_with_prompt on an AsyncAnthropic client"""
+    try:
+        start = time.time()
+        message = await client.messages.create(**build_claude_request(base_prompt, text))
+        record_claude_usage(message, stage, time.time() - start)
+        return message.content[0].text
+    except Exception as e:
+        print(f"⚠️ Claude API error for chunk: {e}")
+        return f"[Error summarizing this chunk: {str(e)}]"
+
+DEFAULT_SUMMARY_PROMPT = """你是一個專門將 Podcast / YouTube 逐字稿轉成「投資整理＋重點摘要」的助手。  
 請全程使用 **繁體中文** 回覆。
 
 ────────────────────────
@@ -346,89 +1259,8 @@ def summarize_with_claude(content: str, prompt: str = None) -> str:
 
 
 """
-    base_prompt = prompt or default_prompt
 
-    def call_claude(text_chunk):
-        full_prompt = base_prompt + "\n\n" + text_chunk
-        try:
-            message = anthropic_client.messages.create(
-                model="claude-3-5-haiku-latest",
-                max_tokens=8192,  # Max allowed for Haiku
-                messages=[
-                    {"role": "user", "content": full_prompt}
-                ]
-            )
-            return message.content[0].text
-        except Exception as e:
-            print(f"⚠️ Claude API error for chunk: {e}")
-            return f"[Error summarizing this chunk: {str(e)}]"
-
-    # Check if content needs splitting (approx 30k chars)
-    if len(content) > 30000:
-        print(f"📦 Content length {len(content)} exceeds limit, using Map-Reduce summarization...")
-        chunks = split_text(content)
-        chunk_summaries = []
-        chunks_metadata = []
-        
-        # Map Phase: Summarize each chunk (with caching)
-        for i, chunk in enumerate(chunks):
-            # Generate cache key for this chunk
-            chunk_hash = hashlib.md5(chunk.encode()).hexdigest()
-            chunk_cache_file = CACHE_DIR / f"chunk_{chunk_hash}.json"
-            
-            chunk_data = None
-            
-            # Check chunk cache
-            if chunk_cache_file.exists():
-                try:
-                    with open(chunk_cache_file, 'r', encoding='utf-8') as f:
-                        cached_chunk = json.load(f)
-                        chunk_summary = cached_chunk['summary']
-                        chunk_data = cached_chunk
-                        print(f"✅ [Map] Chunk {i+1}/{len(chunks)} cache HIT")
-                except Exception as e:
-                    print(f"⚠️ Chunk cache read error: {e}")
-            
-            if not chunk_data:
-                print(f"🔄 [Map] Processing chunk {i+1}/{len(chunks)} ({len(chunk)} chars)...")
-                chunk_summary = call_claude(chunk)
-                
-                # Save chunk summary to cache
-                try:
-                    chunk_data = {
-                        'chunk_hash': chunk_hash,
-                        'cached_at': datetime.now().isoformat(),
-                        'summary': chunk_summary,
-                        'chunk_length': len(chunk)
-                    }
-                    with open(chunk_cache_file, 'w', encoding='utf-8') as f:
-                        json.dump(chunk_data, f, ensure_ascii=False, indent=2)
-                    print(f"💾 Saved chunk {i+1} to cache")
-                except Exception as e:
-                    print(f"⚠️ Failed to cache chunk: {e}")
-                    # Create temporary chunk data even if cache failed
-                    chunk_data = {
-                        'chunk_hash': chunk_hash,
-                        'cached_at': datetime.now().isoformat(),
-                        'summary': chunk_summary,
-                        'chunk_length': len(chunk)
-                    }
-            
-            chunk_summaries.append(chunk_summary)
-            chunks_metadata.append(chunk_data)
-            
-        # Reduce Phase: Concatenate summaries + Generate final overview
-        if len(chunk_summaries) > 1:
-            print("🔄 [Reduce] Concatenating chunk summaries...")
-            # Step 1: Direct concatenation
-            concatenated_summaries = "\n\n---\n\n".join([
-                f"### 第 {i+1} 部分\n{summary}" 
-                for i, summary in enumerate(chunk_summaries)
-            ])
-            
-            # Step 2: Generate final overview based on concatenated content
-            print("🔄 [Reduce] Generating final overview summary...")
-            overview_prompt = f"""請基於全部 chunk，產生一份 **投資向、可回聽、可做筆記** 的高品質總結，包含：
+OVERVIEW_PROMPT_TEMPLATE = """請基於全部 chunk，產生一份 **投資向、可回聽、可做筆記** 的高品質總結，包含：
 
 1️⃣ 節目總結（3–7 句，抓出主軸）  
 2️⃣ 深度投資重點整理（條列＋小標題）  
@@ -453,37 +1285,626 @@ def summarize_with_claude(content: str, prompt: str = None) -> str:
 
 {concatenated_summaries}
 """
+
+def emit(progress, event: str, data: dict):
+    """Report a pipeline event to an optional progress(event, data) callback (used for streaming)"""
+    if progress:
+        progress(event, data)
+
+def item_progress(progress, title: str, final: bool = False):
+    """
+    Progress callback for one video / episode of a channel: tags events with
+    the item and drops its token stream, unless the item's summary is the
+    final summary (final=True, a single-item listing).
+    """
+    if not progress:
+        return None
+    def forward(event, data):
+        if event == "token" and final:
+            progress(event, data)
+        elif event != "token":
+            progress(event, dict(data, item=title))
+    return forward
+
+def hash_content(text: str) -> str:
+    """Content hash of a transcript / chunk / summary text"""
+    return hashlib.md5(text.encode()).hexdigest()
+
+def get_summary_params() -> str:
+    """Settings besides content, prompt and model that change a (possibly multi-chunk) summary"""
+    return json.dumps({
+        "chunk_tokens": CLAUDE_CHUNK_TOKENS,
+        "chunk_overlap": TRANSCRIPT_CHUNK_OVERLAP,
+        "token_counter": TOKEN_COUNTER,
+        "reduce_fan_in": REDUCE_FAN_IN,
+        "compaction": [TRANSCRIPT_COMPACTION, COMPACTION_REMOVE_FILLERS, COMPACTION_COLLAPSE_REPEATS, COMPACTION_TIMESTAMP_SECONDS]
+    }, sort_keys=True)
+
+def summary_cache_key(content_hash: str, base_prompt: str, params: str = "") -> str:
+    """
+    Key of every summary cache (chunk, reduce group, item, video, channel):
+    content hash, prompt hash, model and generation params. Identical content
+    under different URLs shares entries; a different prompt or model never does.
+    """
+    prompt_hash = hash_content(base_prompt)
+    return hashlib.md5(f"{content_hash}|{prompt_hash}|{CLAUDE_MODEL}|{CLAUDE_MAX_TOKENS}|{params}".encode()).hexdigest()
+
+def get_chunk_cache_file(chunk: str, base_prompt: str) -> Path:
+    """Map-phase summary cache file of one chunk (also filled by bulk batches)"""
+    return CACHE_DIR / f"chunk_{summary_cache_key(hash_content(chunk), base_prompt)}.json"
+
+def load_chunk_summary(chunk: str, base_prompt: str) -> Optional[dict]:
+    """Cached summary data of a chunk, or None"""
+    chunk_cache_file = get_chunk_cache_file(chunk, base_prompt)
+    if chunk_cache_file.exists():
+        try:
+            with open(chunk_cache_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"⚠️ Chunk cache read error: {e}")
+    return None
+
+def save_chunk_summary(chunk: str, base_prompt: str, summary: str) -> dict:
+    """Cache a chunk's summary (error placeholders are not cached) and return its metadata"""
+    chunk_data = {
+        'chunk_hash': hash_content(chunk),
+        'cached_at': datetime.now().isoformat(),
+        'summary': summary,
+        'chunk_length': len(chunk),
+        'chunk_tokens': estimate_tokens(chunk)
+    }
+    if not summary.startswith("[Error summarizing"):
+        try:
+            write_json_atomic(get_chunk_cache_file(chunk, base_prompt), chunk_data)
+        except Exception as e:
+            print(f"⚠️ Failed to cache chunk: {e}")
+    return chunk_data
+
+def get_map_chunks(content: str, base_prompt: str) -> Optional[List[str]]:
+    """Chunks for the Map phase, or None when the content fits one call's token budget"""
+    chunk_budget = get_chunk_token_budget(base_prompt)
+    content_tokens = count_transcript_tokens(content)
+    if content_tokens <= chunk_budget:
+        return None
+    
+    print(f"📦 Content ~{content_tokens} tokens exceeds {chunk_budget} token budget, using Map-Reduce summarization...")
+    # Scale the local per-segment estimate to the transcript's counted total
+    scale = content_tokens / estimate_tokens(content)
+    return split_transcript(
+        content,
+        chunk_budget,
+        measure=lambda text: estimate_tokens(text) * scale
+    )
+
+async def map_chunks(chunks: List[str], base_prompt: str, progress=None) -> List[dict]:
+    """
+    Map phase: summarize chunks concurrently (at most CLAUDE_MAP_CONCURRENCY
+    calls in flight), using the per-chunk cache. Returns chunk metadata in chunk order.
+    """
+    semaphore = asyncio.Semaphore(CLAUDE_MAP_CONCURRENCY)
+    
+    async with AsyncAnthropic(api_key=ANTHROPIC_API_KEY) as client:
+        async def map_chunk(i, chunk):
+            # Check chunk cache
+            cached_chunk = load_chunk_summary(chunk, base_prompt)
+            if cached_chunk:
+                print(f"✅ [Map] Chunk {i+1}/{len(chunks)} cache HIT")
+                emit(progress, "chunk_summary", {"index": i, "total": len(chunks), "summary": cached_chunk['summary'], "cached": True})
+                return cached_chunk
+            
+            async with semaphore:
+                print(f"🔄 [Map] Processing chunk {i+1}/{len(chunks)} ({len(chunk)} chars)...")
+                chunk_summary = await call_claude_with_prompt_async(client, base_prompt, chunk, "map")
+            
+            chunk_data = save_chunk_summary(chunk, base_prompt, chunk_summary)
+            print(f"💾 Saved chunk {i+1} to cache")
+            emit(progress, "chunk_summary", {"index": i, "total": len(chunks), "summary": chunk_summary, "cached": False})
+            return chunk_data
+        
+        # A 1-token call writes the prompt cache, so the concurrent chunks read it instead of each writing it
+        uncached = [chunk for chunk in chunks if not get_chunk_cache_file(chunk, base_prompt).exists()]
+        if len(uncached) > 1 and is_prompt_cacheable(base_prompt):
+            try:
+                start = time.time()
+                message = await client.messages.create(**dict(build_claude_request(base_prompt, "OK"), max_tokens=1))
+                record_claude_usage(message, "warmup", time.time() - start)
+            except Exception as e:
+                print(f"⚠️ Prompt cache warm-up failed: {e}")
+        
+        return list(await asyncio.gather(*[map_chunk(i, chunk) for i, chunk in enumerate(chunks)]))
+
+async def reduce_tree(sections: List[tuple], base_prompt: str, progress=None) -> List[tuple]:
+    """
+    Reduce (heading, summary) sections in groups of REDUCE_FAN_IN, concurrently,
+    level by level until at most REDUCE_FAN_IN remain.
+    
+    Each group's result is cached by its inputs (reduce_{hash}.json), so a
+    changed chunk only re-reduces the groups on its path up the tree. A
+    leftover single section (e.g. the 9th of 9) moves up a level unchanged.
+    """
+    semaphore = asyncio.Semaphore(CLAUDE_MAP_CONCURRENCY)
+    
+    async with AsyncAnthropic(api_key=ANTHROPIC_API_KEY) as client:
+        async def reduce_group(level, group):
+            if len(group) == 1:
+                return group[0]
+            
+            # A group's heading spans its first and last original sections
+            first, last = group[0][2], group[-1][3]
+            heading = first if first == last else f"{first} ～ {last}"
+            concatenated_summaries = "\n\n---\n\n".join([f"### {title}\n{summary}" for title, summary, _, _ in group])
+            group_hash = summary_cache_key(hash_content(concatenated_summaries), base_prompt)
+            group_cache_file = CACHE_DIR / f"reduce_{group_hash}.json"
             
-            final_output = call_claude(overview_prompt)
+            if group_cache_file.exists():
+                try:
+                    with open(group_cache_file, 'r', encoding='utf-8') as f:
+                        cached_group = json.load(f)
+                    print(f"✅ [Reduce L{level}] {heading} cache HIT")
+                    emit(progress, "reduce", {"level": level, "heading": heading, "cached": True})
+                    return heading, cached_group['summary'], first, last
+                except Exception as e:
+                    print(f"⚠️ Reduce cache read error: {e}")
+            
+            async with semaphore:
+                print(f"🔄 [Reduce L{level}] Combining {len(group)} summaries: {heading}")
+                overview_prompt = OVERVIEW_PROMPT_TEMPLATE.format(concatenated_summaries=concatenated_summaries)
+                summary = await call_claude_with_prompt_async(client, base_prompt, overview_prompt, "reduce")
+            
+            if not summary.startswith("[Error summarizing"):
+                try:
+                    write_json_atomic(group_cache_file, {
+                        'group_hash': group_hash,
+                        'level': level,
+                        'heading': heading,
+                        'summary': summary,
+                        'cached_at': datetime.now().isoformat()
+                    })
+                except Exception as e:
+                    print(f"⚠️ Failed to cache reduce group: {e}")
+            emit(progress, "reduce", {"level": level, "heading": heading, "cached": False})
+            return heading, summary, first, last
+        
+        level = 0
+        nodes = [(title, summary, title, title) for title, summary in sections]
+        while len(nodes) > REDUCE_FAN_IN:
+            level += 1
+            groups = [nodes[i:i + REDUCE_FAN_IN] for i in range(0, len(nodes), REDUCE_FAN_IN)]
+            nodes = await asyncio.gather(*[reduce_group(level, group) for group in groups])
+    return [(heading, summary) for heading, summary, _, _ in nodes]
+
+def reduce_summaries(sections: List[tuple], base_prompt: str, progress=None) -> str:
+    """Reduce phase: tree-reduce (heading, summary) sections, then one final overview (streamed to progress)"""
+    if len(sections) > REDUCE_FAN_IN:
+        sections = asyncio.run(reduce_tree(sections, base_prompt, progress))
+    
+    concatenated_summaries = "\n\n---\n\n".join([f"### {title}\n{summary}" for title, summary in sections])
+    print(f"🔄 [Reduce] Generating final overview from {len(sections)} summaries...")
+    overview_prompt = OVERVIEW_PROMPT_TEMPLATE.format(concatenated_summaries=concatenated_summaries)
+    return call_claude_with_prompt(
+        base_prompt, overview_prompt, "overview",
+        on_text=(lambda delta: progress("token", {"text": delta})) if progress else None
+    )
+
+def summarize_with_claude(content: str, prompt: str = None, progress=None) -> str:
+    """
+    Summarize content using Claude AI with Map-Reduce support for long content.
+    
+    progress(event, data), if given, receives each chunk summary as it completes
+    and the final summary's tokens as they are generated.
+    """
+    if not anthropic_client:
+        raise HTTPException(
+            status_code=503,
+            detail="AI summarization not available - ANTHROPIC_API_KEY not configured"
+        )
+    
+    base_prompt = prompt or DEFAULT_SUMMARY_PROMPT
+
+    def call_claude(text_chunk):
+        return call_claude_with_prompt(
+            base_prompt, text_chunk,
+            on_text=(lambda delta: progress("token", {"text": delta})) if progress else None
+        )
+
+    # Check if content needs splitting (token budget per chunk)
+    chunks = get_map_chunks(content, base_prompt)
+    if chunks:
+        # Map Phase: Summarize chunks concurrently (with caching)
+        chunks_metadata = asyncio.run(map_chunks(chunks, base_prompt, progress))
+        chunk_summaries = [chunk_data['summary'] for chunk_data in chunks_metadata]
+            
+        # Reduce Phase: Combine chunk summaries (as a tree when there are many) into a final overview
+        if len(chunk_summaries) > 1:
+            final_output = reduce_summaries(
+                [(f"第 {i+1} 部分", summary) for i, summary in enumerate(chunk_summaries)],
+                base_prompt,
+                progress
+            )
             return final_output, chunks_metadata
         else:
             return chunk_summaries[0], chunks_metadata
     else:
-        # Single chunk processing
+        # Single chunk processing (a bulk backfill may already have summarized it)
+        cached_chunk = load_chunk_summary(content, base_prompt)
+        if cached_chunk:
+            print("✅ Single-call summary cache HIT")
+            return cached_chunk['summary'], []
         summary = call_claude(content)
+        save_chunk_summary(content, base_prompt, summary)
         return summary, []
     
+def load_transcription_metrics() -> List[dict]:
+    """Return the transcription metrics history, reading it from disk on first use"""
+    global _transcription_metrics
+    with _transcription_metrics_lock:
+        if _transcription_metrics is None:
+            _transcription_metrics = []
+            if TRANSCRIPTION_METRICS_FILE.exists():
+                with open(TRANSCRIPTION_METRICS_FILE, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        try:
+                            _transcription_metrics.append(json.loads(line))
+                        except json.JSONDecodeError:
+                            continue
+        return list(_transcription_metrics)
+
+def record_transcription_metrics(metrics: dict):
+    """Append one transcription's performance record to the history"""
+    load_transcription_metrics()
+    with _transcription_metrics_lock:
+        _transcription_metrics.append(metrics)
+        try:
+            with open(TRANSCRIPTION_METRICS_FILE, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(metrics, ensure_ascii=False) + "\n")
+        except Exception as e:
+            print(f"⚠️ Metrics write error: {e}")
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Linear-interpolated percentile of a list of numbers"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+def get_model_speed(name: str) -> float:
+    """Realtime multiple for a model: measured median if enough history exists, else the spec estimate"""
+    rtfs = [m["real_time_factor"] for m in load_transcription_metrics()
+            if m["model"] == name and m.get("real_time_factor")]
+    if len(rtfs) >= MIN_SAMPLES_FOR_MEASURED_SPEED:
+        return 1 / percentile(rtfs, 50)
+    return WHISPER_MODEL_SPECS[name]["speed"]
+
+def get_whisper_model(name: str = None) -> WhisperModel:
+    """Return a Whisper model from the registry, loading it on first use"""
+    name = name or WHISPER_MODEL_SIZE
+    spec = WHISPER_MODEL_SPECS.get(name)
+    if spec is None:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown Whisper model '{name}'. Available: {', '.join(WHISPER_MODEL_SPECS)}"
+        )
+    
+    with _whisper_models_lock:
+        if name in _whisper_models:
+            _whisper_models.move_to_end(name)
+            return _whisper_models[name]
+        
+        # Unload least recently used models (default model last) until the new one fits the budget
+        used_mb = sum(WHISPER_MODEL_SPECS[n]["memory_mb"] for n in _whisper_models)
+        eviction_order = [n for n in _whisper_models if n != WHISPER_MODEL_SIZE]
+        eviction_order += [n for n in _whisper_models if n == WHISPER_MODEL_SIZE]
+        for evicted in eviction_order:
+            if used_mb + spec["memory_mb"] <= WHISPER_MEMORY_BUDGET_MB:
+                break
+            del _whisper_models[evicted]
+            used_mb -= WHISPER_MODEL_SPECS[evicted]["memory_mb"]
+            print(f"♻️ Unloaded Whisper model '{evicted}' to stay within {WHISPER_MEMORY_BUDGET_MB}MB")
+        
+        print(f"📥 Loading Whisper model '{name}' ({spec['model_size']}, {spec['compute_type']}) on CUDA...")
+        model = WhisperModel(
+            spec["model_size"],
+            device="cuda",
+            compute_type=spec["compute_type"]
+        )
+        _whisper_models[name] = model
+        return model
+
+def select_whisper_model(model: Optional[str] = None, latency_budget: Optional[float] = None,
+                         audio_duration: Optional[float] = None) -> str:
+    """Pick a registry entry: explicit model first, then latency budget, then the default"""
+    if model:
+        if model not in WHISPER_MODEL_SPECS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown Whisper model '{model}'. Available: {', '.join(WHISPER_MODEL_SPECS)}"
+            )
+        return model
+    
+    if latency_budget and audio_duration:
+        # Slowest (most accurate) model whose estimated decode time fits the budget
+        speeds = {name: get_model_speed(name) for name in WHISPER_MODEL_SPECS}
+        by_speed = sorted(speeds, key=speeds.get)
+        for name in by_speed:
+            if audio_duration / speeds[name] <= latency_budget:
+                return name
+        return by_speed[-1]
+    
+    return WHISPER_MODEL_SIZE
+
+def normalize_whisper_language(lang: Optional[str]) -> Optional[str]:
+    """Map subtitle-style codes (zh-TW, en-US) to Whisper language codes (zh, en)"""
+    if not lang:
+        return None
+    return lang.split('-')[0].split('_')[0].lower()
+
+def get_cached_language(source_key: Optional[str]) -> Optional[str]:
+    """Look up the language previously detected for a channel or show"""
+    if not source_key or not LANGUAGE_CACHE_FILE.exists():
+        return None
+    try:
+        with open(LANGUAGE_CACHE_FILE, 'r', encoding='utf-8') as f:
+            entry = json.load(f).get(source_key)
+            return entry["language"] if entry else None
+    except Exception as e:
+        print(f"⚠️ Language cache read error: {e}")
+        return None
+
+def save_detected_language(source_key: Optional[str], language: str, probability: float):
+    """Remember a confidently detected language for a channel or show"""
+    if not source_key or probability < LANGUAGE_CACHE_MIN_PROBABILITY:
+        return
+    with _language_cache_lock:
+        try:
+            languages = {}
+            if LANGUAGE_CACHE_FILE.exists():
+                with open(LANGUAGE_CACHE_FILE, 'r', encoding='utf-8') as f:
+                    languages = json.load(f)
+            languages[source_key] = {
+                "language": language,
+                "probability": round(probability, 3),
+                "detected_at": datetime.now().isoformat()
+            }
+            write_json_atomic(LANGUAGE_CACHE_FILE, languages)
+            print(f"💾 Cached language '{language}' for {source_key}")
+        except Exception as e:
+            print(f"⚠️ Language cache write error: {e}")
+
+def get_language_source_key(info: dict, prefix: str) -> Optional[str]:
+    """Channel / show identity from yt-dlp info, used as the language cache key"""
+    source = info.get('channel_id') or info.get('series') or info.get('channel') or info.get('uploader')
+    return f"{prefix}:{source}" if source else None
+
+def compute_audio_fingerprint(audio) -> str:
+    """
+    Content fingerprint of decoded 16kHz mono PCM.
+    
+    The same episode served as a different container/URL decodes to the same
+    samples, so transcripts can be shared across URLs.
+    """
+    sha = hashlib.sha256()
+    block = WHISPER_SAMPLE_RATE * 60
+    for i in range(0, len(audio), block):
+        sha.update((audio[i:i + block] * 32767).astype('int16').tobytes())
+    return sha.hexdigest()
+
+def get_transcript_checkpoint_file(audio_fingerprint: str, params: dict) -> Path:
+    """Checkpoint path keyed by audio fingerprint and transcription parameters"""
+    params_hash = hashlib.md5(json.dumps(params, sort_keys=True).encode()).hexdigest()
+    return CACHE_DIR / f"transcript_{audio_fingerprint[:32]}_{params_hash[:12]}.json"
+
+def find_transcript_by_fingerprint(audio_fingerprint: str, model_name: Optional[str] = None,
+                                   language: Optional[str] = None) -> Optional[dict]:
+    """Find a completed transcript of the same audio, whatever URL it was fetched from"""
+    for transcript_file in CACHE_DIR.glob(f"transcript_{audio_fingerprint[:32]}_*.json"):
+        try:
+            with open(transcript_file, 'r', encoding='utf-8') as f:
+                transcript = json.load(f)
+        except Exception:
+            continue
+        if not transcript.get("complete"):
+            continue
+        if model_name and transcript["params"]["model"] != model_name:
+            continue
+        if language and transcript.get("language") != language:
+            continue
+        return transcript
+    return None
+
+def transcribe_audio_file(audio_file: str, model_name: str, language: Optional[str] = None,
+                          language_source_key: Optional[str] = None, source_url: Optional[str] = None,
+                          explicit_model: bool = False) -> tuple:
+    """
+    Transcribe a downloaded audio file with the given registry model.
+    
+    Decoded segments are checkpointed to the cache as they arrive, so a retry
+    after a crash or failure seeks past the completed offset instead of
+    starting over.
+    
+    The language is forced when the request gives one, or when one was
+    previously detected for the same channel/show; only otherwise does
+    Whisper run language detection.
+    
+    Any completed transcript of the same decoded audio (e.g. the Apple page
+    and the RSS enclosure of one episode) is reused without running Whisper;
+    an explicitly requested model must match.
+    
+    Returns (transcribed_part, transcription_info).
+    """
+    # Decoded PCM stays in memory until Whisper is done with it, so bound the files held,
+    # not just the GPU runs (channel workers would otherwise all decode while waiting)
+    with _audio_decode_semaphore:
+        try:
+            file_size_mb = os.path.getsize(audio_file) / (1024 * 1024)
+            print(f"🎙️ Starting transcription with faster_whisper (GPU, model: {model_name})...")
+            print(f"File size: {file_size_mb:.1f}MB")
+        
+            language = normalize_whisper_language(language)
+            language_source = "request" if language else None
+            if not language:
+                language = get_cached_language(language_source_key)
+                language_source = "show_cache" if language else "detected"
+        
+            # Decode once: the PCM is both fingerprinted and fed to Whisper
+            audio = decode_audio(audio_file, sampling_rate=WHISPER_SAMPLE_RATE)
+            audio_fingerprint = compute_audio_fingerprint(audio)
+        
+            # Only an explicitly requested language changes the output; a show-cache hint must
+            # still resume checkpoints written while the language was being detected
+            params = {"model": model_name, "beam_size": 5,
+                      "language": language if language_source == "request" else None}
+            checkpoint_file = get_transcript_checkpoint_file(audio_fingerprint, params)
+            checkpoint = {
+                "audio_fingerprint": audio_fingerprint,
+                "params": params,
+                "language": None,
+                "completed_offset": 0.0,
+                "complete": False,
+                "source_urls": [],
+                "segments": {}
+            }
+            if checkpoint_file.exists():
+                try:
+                    with open(checkpoint_file, 'r', encoding='utf-8') as f:
+                        checkpoint = json.load(f)
+                except Exception as e:
+                    print(f"⚠️ Checkpoint read error, starting over: {e}")
+        
+            if not checkpoint["complete"]:
+                existing = find_transcript_by_fingerprint(
+                    audio_fingerprint,
+                    model_name if explicit_model else None,
+                    language if language_source == "request" else None
+                )
+                if existing:
+                    print(f"✅ Audio fingerprint HIT {audio_fingerprint[:12]} "
+                          f"(transcribed from {existing.get('source_urls', ['?'])[0][:50]}...)")
+                    checkpoint = existing
+        
+            transcribed_part = {int(start): text for start, text in checkpoint["segments"].items()}
+            transcription_info = {
+                "whisper_model": checkpoint["params"]["model"],
+                "language": checkpoint["language"],
+                "language_source": language_source,
+                "language_detection_skipped": language_source != "detected",
+                "audio_fingerprint": audio_fingerprint,
+            }
+            if checkpoint["complete"]:
+                print(f"✅ Transcript HIT ({len(transcribed_part)} segments), skipping Whisper")
+                transcription_info["transcription_seconds"] = 0.0
+                return transcribed_part, transcription_info
+        
+            source_urls = checkpoint.setdefault("source_urls", [])
+            if source_url and source_url not in source_urls:
+                source_urls.append(source_url)
+        
+            def save_checkpoint():
+                checkpoint["segments"] = transcribed_part
+                checkpoint["updated_at"] = datetime.now().isoformat()
+                try:
+                    write_json_atomic(checkpoint_file, checkpoint)
+                except Exception as e:
+                    print(f"⚠️ Checkpoint write error: {e}")
+        
+            # GPU slot: limits concurrent Whisper runs across requests and channel workers
+            with _transcription_semaphore:
+                model = get_whisper_model(model_name)
+            
+                transcribe_kwargs = {"beam_size": params["beam_size"]}
+                if language:
+                    transcribe_kwargs["language"] = language
+                    print(f"🌐 Forcing language '{language}' ({language_source}), skipping language detection")
+                resume_offset = checkpoint["completed_offset"]
+                if resume_offset > 0:
+                    print(f"⏩ Resuming transcription from {resume_offset:.1f}s ({len(transcribed_part)} segments cached)")
+                    transcribe_kwargs["clip_timestamps"] = [resume_offset]
+                    if checkpoint["language"]:
+                        transcribe_kwargs["language"] = checkpoint["language"]
+            
+                start_time = time.time()
+                segments, info = model.transcribe(audio, **transcribe_kwargs)
+                setup_time = time.time() - start_time
+                audio_seconds = max(info.duration - resume_offset, 0.0)
+                print(f"🎧 Audio: {audio_seconds:.0f}s to decode, estimated time: "
+                      f"~{int(audio_seconds / get_model_speed(model_name))}s (setup took {setup_time:.1f}s)")
+                checkpoint["language"] = info.language
+                transcription_info["language"] = info.language
+                if language_source == "detected":
+                    print(f"🌐 Detected language '{info.language}' (p={info.language_probability:.2f})")
+                    save_detected_language(language_source_key, info.language, info.language_probability)
+            
+                last_saved_offset = resume_offset
+                segment_count = 0
+                try:
+                    for segment in segments:
+                        segment_count += 1
+                        start = int(segment.start)
+                        text = segment.text.strip()
+                        transcribed_part[start] = text
+                        checkpoint["completed_offset"] = segment.end
+                        if segment.end - last_saved_offset >= TRANSCRIPT_CHECKPOINT_SECONDS:
+                            save_checkpoint()
+                            last_saved_offset = segment.end
+                except Exception:
+                    save_checkpoint()
+                    print(f"💾 Saved transcription checkpoint at {checkpoint['completed_offset']:.1f}s")
+                    raise
+        
+            checkpoint["complete"] = True
+            save_checkpoint()
+        
+            # Wall time includes the lazy segment decode, not just the transcribe() setup call
+            decode_seconds = time.time() - start_time
+            real_time_factor = decode_seconds / audio_seconds if audio_seconds else None
+            transcription_info["transcription_seconds"] = round(decode_seconds, 2)
+            transcription_info["real_time_factor"] = round(real_time_factor, 4) if real_time_factor else None
+            print(f"✅ Transcription completed in {decode_seconds:.1f}s "
+                  f"(RTF {real_time_factor or 0:.3f}, language: {info.language}, source: {language_source})")
+        
+            record_transcription_metrics({
+                "recorded_at": datetime.now().isoformat(),
+                "model": model_name,
+                "compute_type": WHISPER_MODEL_SPECS[model_name]["compute_type"],
+                "audio_seconds": round(audio_seconds, 2),
+                "decode_seconds": round(decode_seconds, 3),
+                "real_time_factor": transcription_info["real_time_factor"],
+                "segments": segment_count,
+                "segments_per_second": round(segment_count / decode_seconds, 3) if decode_seconds else None,
+                "language": info.language,
+                "language_source": language_source,
+                "resumed_from": round(resume_offset, 2),
+            })
+        
+            return transcribed_part, transcription_info
+        except HTTPException:
+            raise
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            raise HTTPException(status_code=500, detail=f"Whisper transcription failed: {str(e)}")
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    global WHISPER_MODEL
     print("🚀 Starting up server...")
     print(f"📥 Preloading faster_whisper model: {WHISPER_MODEL_SIZE}")
     print("⚡ GPU-ONLY MODE: CPU fallback disabled")
     try:
-        print("Loading model on CUDA...")
-        WHISPER_MODEL = WhisperModel(
-            WHISPER_MODEL_SIZE,
-            device="cuda",
-            compute_type="float16"
-        )
+        get_whisper_model(WHISPER_MODEL_SIZE)
         print("✅ Model preloaded successfully on GPU!")
     except Exception as e:
         print(f"❌ FATAL: Could not load model on GPU: {e}")
         print("💡 Ensure CUDA and cuDNN are properly installed")
         raise RuntimeError(f"GPU initialization failed: {e}")
     
+    if SUBSCRIPTION_POLLER_ENABLED:
+        start_subscription_poller()
+    
     yield
     print("👋 Shutting down server...")
+    _subscription_stop.set()
 
 app = FastAPI(
     title="yt-mcp-server",
@@ -499,6 +1920,8 @@ app = FastAPI(
 class VideoRequest(BaseModel):
     url: str
     lang: str | None = None
+    model: str | None = None  # Whisper registry entry, e.g. "tiny", "base", "medium"
+    latency_budget: float | None = None  # seconds; picks the largest model expected to fit
 
 def parse_vtt(vtt_content):
     lines = vtt_content.split('\n')
@@ -546,67 +1969,68 @@ def get_subtitles(request: VideoRequest):
         return cached_result["result"]
     
     # First, try to get subtitles
-    ydl_opts = {
-        'writesubtitles': True,
-        'writeautomaticsub': True,
-        'subtitleslangs': [lang],
-        'skip_download': True,
-        'outtmpl': '/tmp/%(id)s.%(ext)s',
-        'quiet': True,
-        'no_warnings': True,
-    }
+    with _caption_fetch_semaphore:
+        ydl_opts = {
+            'writesubtitles': True,
+            'writeautomaticsub': True,
+            'subtitleslangs': [lang],
+            'skip_download': True,
+            'outtmpl': '/tmp/%(id)s.%(ext)s',
+            'quiet': True,
+            'no_warnings': True,
+        }
     
-    try:
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(url, download=True)
-            video_id = info.get('id')
-            title = info.get('title')
-            
-            pattern = f"/tmp/{video_id}.{lang}.vtt"
-            vtt_files = glob.glob(pattern)
+        try:
+            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                info = ydl.extract_info(url, download=True)
+                video_id = info.get('id')
+                title = info.get('title')
             
-            if not vtt_files:
-                pattern = f"/tmp/{video_id}.*.vtt"
+                pattern = f"/tmp/{video_id}.{lang}.vtt"
                 vtt_files = glob.glob(pattern)
             
-            if vtt_files:
-                # Subtitles found, use them
-                print(f"✅ Found subtitles for {video_id}")
-                vtt_file = vtt_files[0]
+                if not vtt_files:
+                    pattern = f"/tmp/{video_id}.*.vtt"
+                    vtt_files = glob.glob(pattern)
+            
+                if vtt_files:
+                    # Subtitles found, use them
+                    print(f"✅ Found subtitles for {video_id}")
+                    vtt_file = vtt_files[0]
                 
-                with open(vtt_file, 'r', encoding='utf-8') as f:
-                    vtt_content = f.read()
+                    with open(vtt_file, 'r', encoding='utf-8') as f:
+                        vtt_content = f.read()
                 
-                cues = parse_vtt(vtt_content)
+                    cues = parse_vtt(vtt_content)
                 
-                transcribed_part = {}
-                for cue in cues:
-                    transcribed_part[cue['start']] = cue['text']
+                    transcribed_part = {}
+                    for cue in cues:
+                        transcribed_part[cue['start']] = cue['text']
                 
-                result = {
-                    "video_id": video_id,
-                    "title": title,
-                    "page": 1,
-                    "total_pages": 1,
-                    "transcribed_part": transcribed_part,
-                    "transcription_method": "subtitles"
-                }
+                    result = {
+                        "video_id": video_id,
+                        "title": title,
+                        "page": 1,
+                        "total_pages": 1,
+                        "transcribed_part": transcribed_part,
+                        "transcription_method": "subtitles"
+                    }
                 
-                save_to_cache(url, result)
+                    save_to_cache(url, result)
                 
-                for f in glob.glob(f"/tmp/{video_id}.*"):
-                    try:
-                        os.remove(f)
-                    except:
-                        pass
+                    for f in glob.glob(f"/tmp/{video_id}.*"):
+                        try:
+                            os.remove(f)
+                        except:
+                            pass
                 
-                return result
-            else:
-                # No subtitles found, fallback to audio transcription
-                print(f"⚠️ No subtitles found for {video_id}, falling back to audio transcription...")
+                    return result
+                else:
+                    # No subtitles found, fallback to audio transcription
+                    print(f"⚠️ No subtitles found for {video_id}, falling back to audio transcription...")
                 
-    except Exception as e:
-        print(f"⚠️ Error getting subtitles: {e}, falling back to audio transcription...")
+        except Exception as e:
+            print(f"⚠️ Error getting subtitles: {e}, falling back to audio transcription...")
     
     # Fallback: Download audio and transcribe with Whisper
     print(f"🎵 Downloading audio for transcription: {url}")
@@ -638,31 +2062,15 @@ def get_subtitles(request: VideoRequest):
             if file_size == 0:
                 raise HTTPException(status_code=500, detail="Downloaded audio file is empty.")
             
-            try:
-                import time
-                file_size_mb = file_size / (1024 * 1024)
-                estimated_time = int(file_size_mb * 2)
-                print(f"🎙️ Starting transcription with faster_whisper (GPU)...")
-                print(f"File size: {file_size_mb:.1f}MB, estimated time: ~{estimated_time}s")
-                
-                global WHISPER_MODEL
-                if WHISPER_MODEL is None:
-                    raise RuntimeError("GPU model not loaded. Server startup may have failed.")
-                
-                start_time = time.time()
-                segments, info = WHISPER_MODEL.transcribe(audio_file, beam_size=5)
-                elapsed_time = time.time() - start_time
-                print(f"✅ Transcription completed in {elapsed_time:.1f}s")
-            except Exception as e:
-                import traceback
-                traceback.print_exc()
-                raise HTTPException(status_code=500, detail=f"Whisper transcription failed: {str(e)}")
-            
-            transcribed_part = {}
-            for segment in segments:
-                start = int(segment.start)
-                text = segment.text.strip()
-                transcribed_part[start] = text
+            model_name = select_whisper_model(request.model, request.latency_budget, info.get('duration'))
+            transcribed_part, transcription_info = transcribe_audio_file(
+                audio_file,
+                model_name,
+                language=request.lang,
+                language_source_key=get_language_source_key(info, "youtube"),
+                source_url=url,
+                explicit_model=bool(request.model)
+            )
             
             result = {
                 "video_id": video_id,
@@ -670,7 +2078,8 @@ def get_subtitles(request: VideoRequest):
                 "page": 1,
                 "total_pages": 1,
                 "transcribed_part": transcribed_part,
-                "transcription_method": "whisper"
+                "transcription_method": "whisper",
+                **transcription_info
             }
             
             save_to_cache(url, result)
@@ -688,6 +2097,8 @@ def get_subtitles(request: VideoRequest):
 class PodcastRequest(BaseModel):
     url: str
     lang: str | None = None
+    model: str | None = None
+    latency_budget: float | None = None
 
 @app.post("/apple_podcast/latest")
 def get_latest_podcast_episode(request: PodcastRequest):
@@ -696,7 +2107,8 @@ def get_latest_podcast_episode(request: PodcastRequest):
     print(f"Processing latest episode request for podcast: {podcast_url}")
 
     try:
-        latest_episode_url = get_latest_episode_url(podcast_url)
+        latest_episode = get_latest_episode(podcast_url)
+        latest_episode_url = latest_episode['url']
     except HTTPException:
         raise
     except Exception as e:
@@ -706,8 +2118,13 @@ def get_latest_podcast_episode(request: PodcastRequest):
             detail=f"Failed to find latest episode: {str(e)}"
         )
     
-    episode_request = VideoRequest(url=latest_episode_url, lang=request.lang)
-    result = get_apple_podcast_subtitles(episode_request)
+    episode_request = VideoRequest(
+        url=latest_episode_url,
+        lang=request.lang,
+        model=request.model,
+        latency_budget=request.latency_budget
+    )
+    result = transcribe_podcast_episode(episode_request, latest_episode)
     
     result["podcast_show_url"] = podcast_url
     result["episode_url"] = latest_episode_url
@@ -739,8 +2156,19 @@ def get_podcast_cache(cache_key: str):
 @app.post("/apple_podcast")
 def get_apple_podcast_subtitles(request: VideoRequest):
     """Accepts an Apple Podcast URL and returns the subtitles using faster_whisper"""
+    return transcribe_podcast_episode(request)
+
+def transcribe_podcast_episode(request: VideoRequest, episode: Optional[dict] = None) -> dict:
+    """
+    Transcribe a podcast episode, cached under its page URL (request.url).
+    
+    A listed episode (see fetch_show_episodes) is downloaded from its RSS
+    enclosure, with the feed's title and duration and the show id as the
+    language cache key; yt-dlp's generic extractor knows none of them.
+    """
     print(f"Processing Apple Podcast request for URL: {request.url}")
     url = request.url
+    episode = episode or {}
     
     view_base_url = "https://be.0xfanslab.com/youtube/channel/summary"
     
@@ -764,9 +2192,11 @@ def get_apple_podcast_subtitles(request: VideoRequest):
     
     try:
         with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(url, download=True)
+            info = ydl.extract_info(episode.get('enclosure_url') or url, download=True)
             video_id = info.get('id')
-            title = info.get('title', 'Untitled Podcast')
+            title = episode.get('title') or info.get('title', 'Untitled Podcast')
+            duration = episode.get('duration') or info.get('duration')
+            show_id = episode.get('show_id') or get_show_id(url)
             
             files = glob.glob(f"{temp_dir}/{video_id}.*")
             if not files:
@@ -779,38 +2209,23 @@ def get_apple_podcast_subtitles(request: VideoRequest):
             if file_size == 0:
                  raise HTTPException(status_code=500, detail="Downloaded audio file is empty.")
 
-            try:
-                import time
-                file_size_mb = file_size / (1024 * 1024)
-                estimated_time = int(file_size_mb * 2)
-                print(f"Starting transcription with faster_whisper (GPU)...")
-                print(f"File size: {file_size_mb:.1f}MB, estimated time: ~{estimated_time}s")
-                
-                global WHISPER_MODEL
-                if WHISPER_MODEL is None:
-                    raise RuntimeError("GPU model not loaded. Server startup may have failed.")
-                
-                start_time = time.time()
-                segments, info = WHISPER_MODEL.transcribe(audio_file, beam_size=5)
-                elapsed_time = time.time() - start_time
-                print(f"✅ Transcription completed in {elapsed_time:.1f}s")
-            except Exception as e:
-                import traceback
-                traceback.print_exc()
-                raise HTTPException(status_code=500, detail=f"Whisper transcription failed: {str(e)}")
-            
-            transcribed_part = {}
-            for segment in segments:
-                start = int(segment.start)
-                text = segment.text.strip()
-                transcribed_part[start] = text
+            model_name = select_whisper_model(request.model, request.latency_budget, duration)
+            transcribed_part, transcription_info = transcribe_audio_file(
+                audio_file,
+                model_name,
+                language=request.lang,
+                language_source_key=f"podcast:{show_id}" if show_id else get_language_source_key(info, "podcast"),
+                source_url=url,
+                explicit_model=bool(request.model)
+            )
                 
             result = {
-                "video_id": video_id,
+                "video_id": episode.get('episode_id') or video_id,
                 "title": title,
                 "page": 1,
                 "total_pages": 1,
-                "transcribed_part": transcribed_part
+                "transcribed_part": transcribed_part,
+                **transcription_info
             }
             
             save_to_cache(url, result)
@@ -828,33 +2243,246 @@ def get_apple_podcast_subtitles(request: VideoRequest):
         if os.path.exists(temp_dir):
             shutil.rmtree(temp_dir)
 
+def gather_items(items: List[dict], process_item, progress=None) -> tuple:
+    """
+    Run process_item for channel videos / show episodes concurrently, at most
+    CHANNEL_ITEM_CONCURRENCY at a time, keeping listing order.
+    
+    process_item returns a dict with at least 'content' (the item's text block).
+    Returns (contents, processed): contents holds the items that succeeded,
+    processed records every item with its status.
+    """
+    def process(item):
+        try:
+            print(f"📝 Processing: {item['title']}")
+            output = process_item(item)
+            emit(progress, "item", {"title": item['title'], "url": item['url'], "ok": True})
+            return (
+                {'title': item['title'], 'url': item['url'], **output},
+                {'title': item['title'], 'url': item['url'], 'has_subtitles': True}
+            )
+        except Exception as e:
+            print(f"⚠️ Failed to process {item['title']}: {e}")
+            emit(progress, "item", {"title": item['title'], "url": item['url'], "ok": False, "error": str(e)})
+            return None, {
+                'title': item['title'],
+                'url': item['url'],
+                'has_subtitles': False,
+                'error': str(e)
+            }
+    
+    with ThreadPoolExecutor(max_workers=max(1, min(CHANNEL_ITEM_CONCURRENCY, len(items)))) as executor:
+        results = list(executor.map(process, items))
+    
+    contents = [content for content, _ in results if content]
+    processed = [status for _, status in results]
+    return contents, processed
+
+def map_video_summary(video: dict, custom_prompt: Optional[str], progress=None, final: bool = False) -> dict:
+    """Per-video map step through the same summary cache as /youtube/summary"""
+    cached = find_video_summary_file(video['url'], custom_prompt) is not None
+    result = run_video_summary(
+        VideoSummaryRequest(url=video['url'], custom_prompt=custom_prompt),
+        item_progress(progress, video['title'], final)
+    )
+    return {
+        'content': result['raw'],
+        'summary': result['summary'],
+        'chunks': result.get('chunks', []),
+        'cached': cached
+    }
+
+def fetch_episode_content(episode: dict) -> dict:
+    """Timestamped transcript block of a podcast episode"""
+    subtitle_result = transcribe_podcast_episode(VideoRequest(url=episode['url']), episode)
+    subtitle_text = " ".join([
+        f"[{format_timestamp(int(ts))}] {text}"
+        for ts, text in subtitle_result['transcribed_part'].items()
+    ])
+    content = f"集數: {episode['title']}\n內容: {subtitle_text}"
+    save_url_index(episode['url'], content_hash=hash_content(content), title=episode['title'])
+    return {'content': content}
+
+def summarize_items(contents: List[dict], prompt: Optional[str], item_label: str, progress=None) -> tuple:
+    """
+    Incremental map-reduce over channel videos / show episodes.
+    
+    Map: every item is summarized on its own and cached by (prompt, item text),
+    so a refresh after one new upload only summarizes that upload. Items that
+    were already mapped upstream (channel videos, via the /youtube/summary
+    cache) carry their 'summary' and are used as-is.
+    Reduce: one overview across the per-item summaries (skipped for a single item).
+    
+    Returns (summary, chunks, item_summaries).
+    """
+    def map_item(item):
+        item_summary = summarize_item(item)
+        emit(progress, "item_summary", {
+            "title": item_summary['title'],
+            "url": item_summary['url'],
+            "summary": item_summary['summary'],
+            "cached": item_summary['cached']
+        })
+        return item_summary
+    
+    def summarize_item(item):
+        if 'summary' in item:
+            return item
+        
+        item_text = item['content']
+        item_hash = get_item_summary_key(hash_content(item_text), prompt)
+        item_cache_file = CACHE_DIR / f"item_summary_{item_hash}.json"
+        
+        if item_cache_file.exists():
+            try:
+                with open(item_cache_file, 'r', encoding='utf-8') as f:
+                    cached_item = json.load(f)
+                print(f"✅ [Map] Item summary cache HIT: {item['title']}")
+                return dict(cached_item, cached=True)
+            except Exception as e:
+                print(f"⚠️ Item summary cache read error: {e}")
+        
+        print(f"🔄 [Map] Summarizing {item_label}: {item['title']}")
+        summary_input, compaction = compact_transcript(item_text)
+        summary, chunks = summarize_with_claude(
+            summary_input, prompt, item_progress(progress, item['title'], final=len(contents) == 1)
+        )
+        item_summary = {
+            'title': item['title'],
+            'url': item['url'],
+            'item_hash': item_hash,
+            'summary': summary,
+            'chunks': chunks,
+            'compaction': compaction
+        }
+        if not summary.startswith("[Error summarizing"):
+            try:
+                write_json_atomic(item_cache_file, dict(item_summary, cached_at=datetime.now().isoformat()))
+            except Exception as e:
+                print(f"⚠️ Failed to cache item summary: {e}")
+        return dict(item_summary, cached=False)
+    
+    with ThreadPoolExecutor(max_workers=max(1, min(CHANNEL_ITEM_CONCURRENCY, len(contents)))) as executor:
+        item_summaries = list(executor.map(map_item, contents))
+    
+    chunks = [chunk for item in item_summaries for chunk in item['chunks']]
+    listing = [
+        {'title': item['title'], 'url': item['url'], 'summary': item['summary'], 'cached': item['cached']}
+        for item in item_summaries
+    ]
+    if len(item_summaries) == 1:
+        return item_summaries[0]['summary'], chunks, listing
+    
+    new_count = sum(1 for item in item_summaries if not item['cached'])
+    print(f"🔄 [Reduce] Combining {len(item_summaries)} summaries ({new_count} newly mapped)...")
+    summary = reduce_summaries(
+        [(f"{item_label}: {item['title']}", item['summary']) for item in item_summaries],
+        prompt or DEFAULT_SUMMARY_PROMPT,
+        progress
+    )
+    return summary, chunks, listing
+
 class VideoSummaryRequest(BaseModel):
     url: str
     custom_prompt: Optional[str] = None
 
-@app.post("/youtube/summary")
-def summarize_youtube_video(request: VideoSummaryRequest):
-    """Summarize a single YouTube video"""
-    print(f"📺 Processing video summary request: {request.url}")
+def get_url_index_file(index_key: str) -> Path:
+    """URL index entry: the content a URL (or channel request) last resolved to"""
+    return CACHE_DIR / f"url_{hashlib.md5(index_key.encode()).hexdigest()}.json"
+
+def load_url_index(index_key: str) -> Optional[dict]:
+    """Read a URL index entry, or None"""
+    index_file = get_url_index_file(index_key)
+    if not index_file.exists():
+        return None
+    try:
+        with open(index_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"⚠️ URL index read error: {e}")
+        return None
+
+def save_url_index(index_key: str, **fields):
+    """Point a URL (or channel request) at its content / summary"""
+    try:
+        write_json_atomic(get_url_index_file(index_key), {"key": index_key, **fields, "indexed_at": datetime.now().isoformat()})
+    except Exception as e:
+        print(f"⚠️ URL index write error: {e}")
+
+def get_item_summary_key(content_hash: str, prompt: Optional[str]) -> str:
+    """Summary key of one video / episode transcript"""
+    return summary_cache_key(content_hash, prompt or DEFAULT_SUMMARY_PROMPT, get_summary_params())
+
+def find_video_summary_file(url: str, custom_prompt: Optional[str]) -> Optional[Path]:
+    """Cached summary of a video via the URL index, or None if the URL is not summarized yet"""
+    entry = load_url_index(url)
+    if not entry:
+        return None
+    cache_file = CACHE_DIR / f"summary_{get_item_summary_key(entry['content_hash'], custom_prompt)}.json"
+    return cache_file if cache_file.exists() else None
+
+def load_cached_summary(cache_file: Path) -> Optional[dict]:
+    """Result stored in a summary cache file, or None if unreadable"""
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            return json.load(f)["result"]
+    except Exception as e:
+        print(f"⚠️ Cache read error: {e}")
+        return None
+
+def stream_summary(run_summary, request) -> StreamingResponse:
+    """
+    Run a summary pipeline in a worker thread and relay its progress events as
+    Server-Sent Events, ending with a "result" (or "error") event. The worker
+    finishes and writes the summary cache even if the client disconnects.
+    """
+    events = queue.Queue()
     
-    # Generate cache key
-    cache_key_data = f"{request.url}|{request.custom_prompt or 'default'}"
-    cache_key = hashlib.md5(cache_key_data.encode()).hexdigest()
-    cache_file = CACHE_DIR / f"summary_{cache_key}.json"
+    def worker():
+        try:
+            result = run_summary(request, lambda event, data: events.put((event, data)))
+            events.put(("result", result))
+        except HTTPException as e:
+            events.put(("error", {"status_code": e.status_code, "detail": e.detail}))
+        except Exception as e:
+            events.put(("error", {"status_code": 500, "detail": str(e)}))
+        finally:
+            events.put(None)
+    
+    threading.Thread(target=worker, daemon=True).start()
+    
+    def event_stream():
+        while True:
+            item = events.get()
+            if item is None:
+                break
+            event, data = item
+            yield f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+def build_video_content(subtitle_result: dict) -> str:
+    """Text of a video as sent to Claude: title line, then captions with timestamps"""
+    subtitle_text = " ".join([f"[{ts}] {text}" for ts, text in subtitle_result['transcribed_part'].items()])
+    return f"影片: {subtitle_result['title']}\n內容: {subtitle_text}"
+
+def run_video_summary(request: VideoSummaryRequest, progress=None) -> dict:
+    """Summarize a single YouTube video, reporting pipeline events to progress(event, data)"""
+    print(f"📺 Processing video summary request: {request.url}")
     
     view_base_url = "https://be.0xfanslab.com/youtube/channel/summary"
     
-    # Check cache
-    if cache_file.exists():
-        try:
-            with open(cache_file, 'r', encoding='utf-8') as f:
-                cached_data = json.load(f)
-                print(f"✅ Summary cache HIT for video: {request.url[:50]}...")
-                result = cached_data["result"]
-                result["view_url"] = f"{view_base_url}?id={cache_key}"
-                return result
-        except Exception as e:
-            print(f"⚠️ Cache read error: {e}")
+    # Check cache: URL index -> content-keyed summary, without fetching the transcript again
+    cache_file = find_video_summary_file(request.url, request.custom_prompt)
+    result = load_cached_summary(cache_file) if cache_file else None
+    if result:
+        print(f"✅ Summary cache HIT for video: {request.url[:50]}...")
+        cache_key = cache_file.stem[len("summary_"):]
+        return dict(result, video_url=request.url, view_url=f"{view_base_url}?id={cache_key}")
     
     print(f"❌ Summary cache MISS for video: {request.url[:50]}...")
     
@@ -864,15 +2492,27 @@ def summarize_youtube_video(request: VideoSummaryRequest):
         video_request = VideoRequest(url=request.url)
         subtitle_result = get_subtitles(video_request)
         
-        # Format subtitle text with timestamps
-        subtitle_text = " ".join([f"[{ts}] {text}" for ts, text in subtitle_result['transcribed_part'].items()])
-        
         # Prepare content for summarization
-        video_content = f"影片: {subtitle_result['title']}\n內容: {subtitle_text}"
+        video_content = build_video_content(subtitle_result)
+        content_hash = hash_content(video_content)
+        save_url_index(request.url, content_hash=content_hash, title=subtitle_result['title'])
+        cache_key = get_item_summary_key(content_hash, request.custom_prompt)
+        cache_file = CACHE_DIR / f"summary_{cache_key}.json"
+        
+        # The same transcript may already be summarized under another URL
+        result = load_cached_summary(cache_file) if cache_file.exists() else None
+        if result:
+            print(f"✅ Summary cache HIT by content for video: {request.url[:50]}...")
+            return dict(result, video_url=request.url, view_url=f"{view_base_url}?id={cache_key}")
+        
+        emit(progress, "transcript", {"title": subtitle_result['title'], "url": request.url, "chars": len(video_content)})
+        summary_input, compaction = compact_transcript(video_content)
+        if compaction:
+            emit(progress, "compaction", compaction)
         
         # Generate AI summary
         print("🤖 Generating AI summary...")
-        summary, chunks = summarize_with_claude(video_content, request.custom_prompt)
+        summary, chunks = summarize_with_claude(summary_input, request.custom_prompt, progress)
         
         # Prepare result
         result = {
@@ -883,6 +2523,7 @@ def summarize_youtube_video(request: VideoSummaryRequest):
             "chunks": chunks,
             "generated_at": datetime.now().isoformat(),
             "raw": video_content,
+            "compaction": compaction,
             "view_url": f"{view_base_url}?id={cache_key}"
         }
         
@@ -921,21 +2562,33 @@ def summarize_youtube_video(request: VideoSummaryRequest):
             detail=f"Video summarization failed: {str(e)}"
         )
 
+@app.post("/youtube/summary")
+def summarize_youtube_video(request: VideoSummaryRequest):
+    """Summarize a single YouTube video"""
+    return run_video_summary(request)
+
+@app.post("/youtube/summary/stream")
+def stream_youtube_video_summary(request: VideoSummaryRequest):
+    """Summarize a single YouTube video as Server-Sent Events"""
+    return stream_summary(run_video_summary, request)
+
 class ChannelSummaryRequest(BaseModel):
     url: str
     max_videos: int = 5
     custom_prompt: Optional[str] = None
 
-@app.post("/youtube/channel/summary")
-def summarize_youtube_channel(request: ChannelSummaryRequest):
-    """Summarize recent videos from a YouTube channel"""
+def run_channel_summary(request: ChannelSummaryRequest, progress=None) -> dict:
+    """Summarize recent videos from a YouTube channel, reporting pipeline events to progress(event, data)"""
     print(f"📺 Processing channel summary request: {request.url}")
     
     max_videos = min(request.max_videos, 10)
+    prompt_to_use = request.custom_prompt or DEFAULT_SUMMARY_PROMPT
     
-    cache_key_data = f"{request.url}|{max_videos}|{request.custom_prompt or 'default'}"
-    cache_key = hashlib.md5(cache_key_data.encode()).hexdigest()
-    cache_file = CACHE_DIR / f"summary_{cache_key}.json"
+    # This request's last summary (summaries themselves are keyed by the videos' contents);
+    # keyed like the summaries, so a model or settings change never serves the old one
+    index_key = summary_cache_key(hash_content(f"channel|{request.url}|{max_videos}"), prompt_to_use, get_summary_params())
+    index_entry = load_url_index(index_key)
+    indexed_file = CACHE_DIR / f"summary_{index_entry['summary_key']}.json" if index_entry else None
     
     view_base_url = "https://be.0xfanslab.com/youtube/channel/summary"
     
@@ -950,35 +2603,24 @@ def summarize_youtube_channel(request: ChannelSummaryRequest):
         latest_video_urls = None
     
     # Check cache with freshness validation
-    if cache_file.exists() and latest_video_urls:
-        try:
-            with open(cache_file, 'r', encoding='utf-8') as f:
-                cached_data = json.load(f)
-                
-                cached_video_urls = cached_data.get("latest_video_urls", [])
-                
-                if cached_video_urls == latest_video_urls:
-                    print(f"✅ Summary cache HIT for channel: {request.url[:50]}...")
-                    print(f"✅ Cache is fresh (latest video unchanged)")
-                    result = cached_data["result"]
-                    result["view_url"] = f"{view_base_url}?id={cache_key}"
-                    return result
-                else:
-                    print(f"🔄 Cache exists but STALE (new video detected)")
-                    print(f"   Cached: {cached_video_urls}")
-                    print(f"   Current: {latest_video_urls}")
-        except Exception as e:
-            print(f"⚠️ Cache read error: {e}")
-    elif cache_file.exists():
-        try:
-            with open(cache_file, 'r', encoding='utf-8') as f:
-                cached_data = json.load(f)
-                print(f"✅ Summary cache HIT (freshness check skipped)")
-                result = cached_data["result"]
-                result["view_url"] = f"{view_base_url}?id={cache_key}"
-                return result
-        except Exception as e:
-            print(f"⚠️ Cache read error: {e}")
+    if indexed_file and indexed_file.exists() and latest_video_urls:
+        cached_video_urls = index_entry.get("latest_video_urls", [])
+        
+        if cached_video_urls == latest_video_urls:
+            result = load_cached_summary(indexed_file)
+            if result:
+                print(f"✅ Summary cache HIT for channel: {request.url[:50]}...")
+                print(f"✅ Cache is fresh (latest video unchanged)")
+                return dict(result, channel_url=request.url, view_url=f"{view_base_url}?id={index_entry['summary_key']}")
+        else:
+            print(f"🔄 Cache exists but STALE (new video detected)")
+            print(f"   Cached: {cached_video_urls}")
+            print(f"   Current: {latest_video_urls}")
+    elif indexed_file and indexed_file.exists():
+        result = load_cached_summary(indexed_file)
+        if result:
+            print(f"✅ Summary cache HIT (freshness check skipped)")
+            return dict(result, channel_url=request.url, view_url=f"{view_base_url}?id={index_entry['summary_key']}")
             
     print(f"❌ Summary cache MISS for channel: {request.url[:50]}...")
     
@@ -991,38 +2633,14 @@ def summarize_youtube_channel(request: ChannelSummaryRequest):
         if not videos:
             raise HTTPException(status_code=404, detail="No videos found in channel")
         
-        video_contents = []
-        processed_videos = []
+        emit(progress, "items", {"items": [{"title": v['title'], "url": v['url']} for v in videos]})
         
-        for video in videos:
-            try:
-                print(f"📝 Processing: {video['title']}")
-                
-                video_request = VideoRequest(url=video['url'])
-                subtitle_result = get_subtitles(video_request)
-                
-                subtitle_text = " ".join([f"[{ts}] {text}" for ts, text in subtitle_result['transcribed_part'].items()])
-                
-                video_contents.append({
-                    'title': video['title'],
-                    'url': video['url'],
-                    'content': subtitle_text  # No limit
-                })
-                
-                processed_videos.append({
-                    'title': video['title'],
-                    'url': video['url'],
-                    'has_subtitles': True
-                })
-                
-            except Exception as e:
-                print(f"⚠️  Failed to process {video['title']}: {e}")
-                processed_videos.append({
-                    'title': video['title'],
-                    'url': video['url'],
-                    'has_subtitles': False,
-                    'error': str(e)
-                })
+        # Map each video through the single-video summary cache; reduce across videos below
+        video_contents, processed_videos = gather_items(
+            videos,
+            lambda video: map_video_summary(video, request.custom_prompt, progress, final=len(videos) == 1),
+            progress
+        )
         
         if not video_contents:
             raise HTTPException(
@@ -1030,19 +2648,27 @@ def summarize_youtube_channel(request: ChannelSummaryRequest):
                 detail="No subtitles found in any of the videos"
             )
         
-        combined_content = "\n\n".join([
-            f"影片: {v['title']}\n內容: {v['content']}"
-            for v in video_contents
-        ])
+        combined_content = "\n\n".join([v['content'] for v in video_contents])
+        
+        # Keyed by the videos' contents: the same set of transcripts is only reduced once
+        contents_hash = hash_content("|".join(hash_content(v['content']) for v in video_contents))
+        cache_key = summary_cache_key(contents_hash, prompt_to_use, get_summary_params())
+        cache_file = CACHE_DIR / f"summary_{cache_key}.json"
+        result = load_cached_summary(cache_file) if cache_file.exists() else None
+        if result:
+            print(f"✅ Summary cache HIT by content for channel: {request.url[:50]}...")
+            save_url_index(index_key, summary_key=cache_key, latest_video_urls=[video['url'] for video in videos])
+            return dict(result, channel_url=request.url, view_url=f"{view_base_url}?id={cache_key}")
         
         print("🤖 Generating AI summary...")
-        summary, chunks = summarize_with_claude(combined_content, request.custom_prompt)
+        summary, chunks, item_summaries = summarize_items(video_contents, request.custom_prompt, "影片", progress)
         
         result = {
             "channel_url": request.url,
             "videos_analyzed": len(processed_videos),
             "videos_processed": processed_videos,
             "summary": summary,
+            "item_summaries": item_summaries,
             "chunks": chunks,
             "generated_at": datetime.now().isoformat(),
             "raw": combined_content,
@@ -1058,11 +2684,11 @@ def summarize_youtube_channel(request: ChannelSummaryRequest):
                     "custom_prompt": request.custom_prompt
                 },
                 "cached_at": datetime.now().isoformat(),
-                "latest_video_urls": [video['url'] for video in videos],
                 "result": result
             }
             with open(cache_file, 'w', encoding='utf-8') as f:
                 json.dump(cache_data, f, ensure_ascii=False, indent=2)
+            save_url_index(index_key, summary_key=cache_key, latest_video_urls=[video['url'] for video in videos])
             print(f"💾 Saved summary to cache: {cache_file.name}")
             
             # Save chunk list separately for frontend to fetch if needed
@@ -1086,6 +2712,16 @@ def summarize_youtube_channel(request: ChannelSummaryRequest):
             detail=f"Channel summarization failed: {str(e)}"
         )
 
+@app.post("/youtube/channel/summary")
+def summarize_youtube_channel(request: ChannelSummaryRequest):
+    """Summarize recent videos from a YouTube channel"""
+    return run_channel_summary(request)
+
+@app.post("/youtube/channel/summary/stream")
+def stream_youtube_channel_summary(request: ChannelSummaryRequest):
+    """Summarize recent videos from a YouTube channel as Server-Sent Events"""
+    return stream_summary(run_channel_summary, request)
+
 def format_timestamp(seconds: int) -> str:
     """Convert seconds to MM:SS format"""
     m, s = divmod(seconds, 60)
@@ -1125,17 +2761,19 @@ class PodcastSummaryRequest(BaseModel):
     max_episodes: int = 1
     custom_prompt: Optional[str] = None
 
-@app.post("/apple_podcast/summary")
-def summarize_podcast_channel(request: PodcastSummaryRequest):
-    """Summarize recent episodes from an Apple Podcast channel"""
+def run_podcast_summary(request: PodcastSummaryRequest, progress=None) -> dict:
+    """Summarize recent episodes from an Apple Podcast channel, reporting pipeline events to progress(event, data)"""
     print(f"🎙️ Processing podcast summary request: {request.url}")
     
     max_episodes = min(request.max_episodes, 5)
     
     prompt_to_use = PODCAST_SUMMARY_PROMPT
-    cache_key_data = f"{request.url}|{max_episodes}|{prompt_to_use}|batch_v1"
-    cache_key = hashlib.md5(cache_key_data.encode()).hexdigest()
-    cache_file = CACHE_DIR / f"summary_{cache_key}.json"
+    
+    # This request's last summary (summaries themselves are keyed by the episodes' contents);
+    # keyed like the summaries, so a model or settings change never serves the old one
+    index_key = summary_cache_key(hash_content(f"podcast|{request.url}|{max_episodes}"), prompt_to_use, get_summary_params())
+    index_entry = load_url_index(index_key)
+    indexed_file = CACHE_DIR / f"summary_{index_entry['summary_key']}.json" if index_entry else None
     
     view_base_url = "https://be.0xfanslab.com/youtube/channel/summary"
     
@@ -1150,35 +2788,24 @@ def summarize_podcast_channel(request: PodcastSummaryRequest):
         latest_episode_urls = None
     
     # Check cache with freshness validation
-    if cache_file.exists() and latest_episode_urls:
-        try:
-            with open(cache_file, 'r', encoding='utf-8') as f:
-                cached_data = json.load(f)
-                
-                cached_episode_urls = cached_data.get("latest_episode_urls", [])
-                
-                if cached_episode_urls == latest_episode_urls:
-                    print(f"✅ Summary cache HIT for podcast: {request.url[:50]}...")
-                    print(f"✅ Cache is fresh (latest episode unchanged)")
-                    result = cached_data["result"]
-                    result["view_url"] = f"{view_base_url}?id={cache_key}"
-                    return result
-                else:
-                    print(f"🔄 Cache exists but STALE (new episode detected)")
-                    print(f"   Cached: {cached_episode_urls}")
-                    print(f"   Current: {latest_episode_urls}")
-        except Exception as e:
-            print(f"⚠️ Cache read error: {e}")
-    elif cache_file.exists():
-        try:
-            with open(cache_file, 'r', encoding='utf-8') as f:
-                cached_data = json.load(f)
-                print(f"✅ Summary cache HIT (freshness check skipped)")
-                result = cached_data["result"]
-                result["view_url"] = f"{view_base_url}?id={cache_key}"
-                return result
-        except Exception as e:
-            print(f"⚠️ Cache read error: {e}")
+    if indexed_file and indexed_file.exists() and latest_episode_urls:
+        cached_episode_urls = index_entry.get("latest_episode_urls", [])
+        
+        if cached_episode_urls == latest_episode_urls:
+            result = load_cached_summary(indexed_file)
+            if result:
+                print(f"✅ Summary cache HIT for podcast: {request.url[:50]}...")
+                print(f"✅ Cache is fresh (latest episode unchanged)")
+                return dict(result, channel_url=request.url, view_url=f"{view_base_url}?id={index_entry['summary_key']}")
+        else:
+            print(f"🔄 Cache exists but STALE (new episode detected)")
+            print(f"   Cached: {cached_episode_urls}")
+            print(f"   Current: {latest_episode_urls}")
+    elif indexed_file and indexed_file.exists():
+        result = load_cached_summary(indexed_file)
+        if result:
+            print(f"✅ Summary cache HIT (freshness check skipped)")
+            return dict(result, channel_url=request.url, view_url=f"{view_base_url}?id={index_entry['summary_key']}")
             
     print(f"❌ Summary cache MISS for podcast: {request.url[:50]}...")
     
@@ -1188,58 +2815,34 @@ def summarize_podcast_channel(request: PodcastSummaryRequest):
         else:
             episodes = current_episodes
         
-        episode_contents = []
-        processed_episodes = []
+        emit(progress, "items", {"items": [{"title": ep['title'], "url": ep['url']} for ep in episodes]})
         
-        for episode in episodes:
-            try:
-                print(f"📝 Processing: {episode['title']}")
-                
-                episode_request = VideoRequest(url=episode['url'])
-                subtitle_result = get_apple_podcast_subtitles(episode_request)
-                
-                subtitle_text = " ".join([
-                    f"[{format_timestamp(int(ts))}] {text}" 
-                    for ts, text in subtitle_result['transcribed_part'].items()
-                ])
-                
-                episode_contents.append({
-                    'title': episode['title'],
-                    'url': episode['url'],
-                    'content': subtitle_text
-                })
-                
-                processed_episodes.append({
-                    'title': episode['title'],
-                    'url': episode['url'],
-                    'has_subtitles': True
-                })
-                
-            except Exception as e:
-                print(f"⚠️ Failed to process {episode['title']}: {e}")
-                processed_episodes.append({
-                    'title': episode['title'],
-                    'url': episode['url'],
-                    'has_subtitles': False,
-                    'error': str(e)
-                })
+        episode_contents, processed_episodes = gather_items(episodes, fetch_episode_content, progress)
         
         if not episode_contents:
             raise HTTPException(status_code=404, detail="No transcripts found")
             
-        combined_content = "\n\n".join([
-            f"集數: {e['title']}\n內容: {e['content']}"
-            for e in episode_contents
-        ])
+        combined_content = "\n\n".join([e['content'] for e in episode_contents])
+        
+        # Keyed by the episodes' contents: the same set of transcripts is only reduced once
+        contents_hash = hash_content("|".join(hash_content(e['content']) for e in episode_contents))
+        cache_key = summary_cache_key(contents_hash, prompt_to_use, get_summary_params())
+        cache_file = CACHE_DIR / f"summary_{cache_key}.json"
+        result = load_cached_summary(cache_file) if cache_file.exists() else None
+        if result:
+            print(f"✅ Summary cache HIT by content for podcast: {request.url[:50]}...")
+            save_url_index(index_key, summary_key=cache_key, latest_episode_urls=[ep['url'] for ep in episodes])
+            return dict(result, channel_url=request.url, view_url=f"{view_base_url}?id={cache_key}")
         
         print("🤖 Generating AI summary...")
-        summary, chunks = summarize_with_claude(combined_content, prompt_to_use)
+        summary, chunks, item_summaries = summarize_items(episode_contents, prompt_to_use, "集數", progress)
         
         result = {
             "channel_url": request.url,
             "videos_analyzed": len(processed_episodes),
             "videos_processed": processed_episodes,
             "summary": summary,
+            "item_summaries": item_summaries,
             "chunks": chunks,
             "generated_at": datetime.now().isoformat(),
             "raw": combined_content,
@@ -1254,11 +2857,11 @@ def summarize_podcast_channel(request: PodcastSummaryRequest):
                     "custom_prompt": request.custom_prompt
                 },
                 "cached_at": datetime.now().isoformat(),
-                "latest_episode_urls": [ep['url'] for ep in episodes],
                 "result": result
             }
             with open(cache_file, 'w', encoding='utf-8') as f:
                 json.dump(cache_data, f, ensure_ascii=False, indent=2)
+            save_url_index(index_key, summary_key=cache_key, latest_episode_urls=[ep['url'] for ep in episodes])
             print(f"💾 Saved podcast summary to cache: {cache_file.name}")
             
             # Save chunk list separately for frontend to fetch if needed
@@ -1279,6 +2882,464 @@ def summarize_podcast_channel(request: PodcastSummaryRequest):
         print(f"❌ Error in podcast summarization: {e}")
         raise HTTPException(status_code=500, detail=f"Podcast summarization failed: {str(e)}")
 
+@app.post("/apple_podcast/summary")
+def summarize_podcast_channel(request: PodcastSummaryRequest):
+    """Summarize recent episodes from an Apple Podcast channel"""
+    return run_podcast_summary(request)
+
+@app.post("/apple_podcast/summary/stream")
+def stream_podcast_channel_summary(request: PodcastSummaryRequest):
+    """Summarize recent episodes from an Apple Podcast channel as Server-Sent Events"""
+    return stream_summary(run_podcast_summary, request)
+
+# Subscriptions: shows / channels polled in the background so summaries are cached before clients ask
+SUBSCRIPTIONS_FILE = CACHE_DIR / "subscriptions.json"
+SUBSCRIPTION_POLLER_ENABLED = os.getenv("SUBSCRIPTION_POLLER_ENABLED", "1") == "1"
+SUBSCRIPTION_MIN_INTERVAL = int(os.getenv("SUBSCRIPTION_MIN_INTERVAL", "300"))
+SUBSCRIPTION_MAX_INTERVAL = int(os.getenv("SUBSCRIPTION_MAX_INTERVAL", "21600"))
+SUBSCRIPTION_INITIAL_INTERVAL = 900
+SUBSCRIPTION_POLL_TICK = 30
+_subscriptions_lock = threading.Lock()
+_subscription_queue = queue.Queue()
+_subscription_jobs_pending = set()  # subscription ids queued or being processed
+_subscription_stop = threading.Event()
+
+class SubscriptionRequest(BaseModel):
+    url: str
+    type: Optional[str] = None  # "podcast" or "youtube_channel"; inferred from the URL if omitted
+    max_items: int = 1
+    custom_prompt: Optional[str] = None
+
+def load_subscriptions() -> dict:
+    """Read the subscription registry"""
+    if not SUBSCRIPTIONS_FILE.exists():
+        return {}
+    try:
+        with open(SUBSCRIPTIONS_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"⚠️ Subscription registry read error: {e}")
+        return {}
+
+def update_subscription(sub_id: str, **fields):
+    """Update fields of one subscription (no-op if it was removed meanwhile)"""
+    with _subscriptions_lock:
+        subscriptions = load_subscriptions()
+        if sub_id in subscriptions:
+            subscriptions[sub_id].update(fields)
+            write_json_atomic(SUBSCRIPTIONS_FILE, subscriptions)
+
+def list_subscription_items(subscription: dict) -> List[str]:
+    """Current item URLs of a subscribed show / channel, newest first"""
+    if subscription["type"] == "podcast":
+        items = get_podcast_episodes(subscription["url"], subscription["max_items"], refresh=True)
+    else:
+        items = get_channel_videos(subscription["url"], subscription["max_items"], refresh=True)
+    return [item['url'] for item in items]
+
+def poll_subscription(subscription: dict):
+    """
+    Check one subscription for new items, enqueue work and adapt its polling interval.
+    
+    The interval only shrinks for items not listed at the previous poll
+    (polled_item_urls). Work is enqueued for items not yet processed
+    (last_item_urls, recorded once their job succeeds) unless a job is
+    already pending, so a failed job is picked up again by a later poll.
+    """
+    sub_id = subscription["id"]
+    now = time.time()
+    try:
+        item_urls = list_subscription_items(subscription)
+    except Exception as e:
+        print(f"⚠️ Subscription poll failed for {subscription['url'][:50]}: {e}")
+        interval = subscription["interval_seconds"]
+        update_subscription(sub_id, last_checked=now, next_check=now + interval, last_error=str(e))
+        return
+    
+    new_items = [url for url in item_urls if url not in subscription.get("polled_item_urls", [])]
+    unprocessed = [url for url in item_urls if url not in subscription.get("last_item_urls", [])]
+    interval = subscription["interval_seconds"]
+    if new_items:
+        # Releases tend to cluster: poll faster after a new item, back off while quiet
+        interval = max(SUBSCRIPTION_MIN_INTERVAL, interval // 2)
+    else:
+        interval = min(SUBSCRIPTION_MAX_INTERVAL, int(interval * 1.5))
+    
+    if unprocessed:
+        with _subscriptions_lock:
+            enqueue = sub_id not in _subscription_jobs_pending
+            _subscription_jobs_pending.add(sub_id)
+        if enqueue:
+            print(f"🆕 {len(unprocessed)} unprocessed item(s) for {subscription['url'][:50]}, enqueueing")
+            _subscription_queue.put(dict(subscription, last_item_urls=item_urls))
+    
+    fields = {
+        "last_checked": now,
+        "next_check": now + interval,
+        "interval_seconds": interval,
+        "polled_item_urls": item_urls,
+        "last_error": None
+    }
+    if new_items:
+        fields["last_new_item_at"] = now
+    update_subscription(sub_id, **fields)
+
+def process_subscription_job(subscription: dict):
+    """Transcribe and summarize a subscription's latest items so the summary cache is warm"""
+    print(f"🔄 Pre-summarizing subscription: {subscription['url'][:50]}")
+    if subscription["type"] == "podcast":
+        summarize_podcast_channel(PodcastSummaryRequest(
+            url=subscription["url"],
+            max_episodes=subscription["max_items"],
+            custom_prompt=subscription.get("custom_prompt")
+        ))
+    else:
+        summarize_youtube_channel(ChannelSummaryRequest(
+            url=subscription["url"],
+            max_videos=subscription["max_items"],
+            custom_prompt=subscription.get("custom_prompt")
+        ))
+    update_subscription(subscription["id"], last_processed_at=time.time(),
+                        last_item_urls=subscription["last_item_urls"])
+
+def subscription_poller_loop():
+    while not _subscription_stop.is_set():
+        now = time.time()
+        for subscription in list(load_subscriptions().values()):
+            if subscription.get("next_check", 0) <= now:
+                poll_subscription(subscription)
+        _subscription_stop.wait(SUBSCRIPTION_POLL_TICK)
+
+def subscription_worker_loop():
+    while not _subscription_stop.is_set():
+        try:
+            subscription = _subscription_queue.get(timeout=SUBSCRIPTION_POLL_TICK)
+        except queue.Empty:
+            continue
+        try:
+            process_subscription_job(subscription)
+        except Exception as e:
+            print(f"⚠️ Subscription job failed for {subscription['url'][:50]}: {e}")
+            # Back off before the retry instead of hammering a failing upstream
+            current = load_subscriptions().get(subscription["id"], subscription)
+            interval = min(SUBSCRIPTION_MAX_INTERVAL, current["interval_seconds"] * 2)
+            update_subscription(subscription["id"], interval_seconds=interval,
+                                next_check=time.time() + interval, last_error=f"Job failed: {e}")
+        finally:
+            with _subscriptions_lock:
+                _subscription_jobs_pending.discard(subscription["id"])
+            _subscription_queue.task_done()
+
+def start_subscription_poller():
+    """Start the background poller and worker threads"""
+    print("📡 Starting subscription poller...")
+    threading.Thread(target=subscription_poller_loop, name="subscription-poller", daemon=True).start()
+    threading.Thread(target=subscription_worker_loop, name="subscription-worker", daemon=True).start()
+
+@app.post("/subscriptions")
+def add_subscription(request: SubscriptionRequest):
+    """Subscribe to a podcast show or YouTube channel for background pre-summarization"""
+    sub_type = request.type or ("podcast" if "podcasts.apple.com" in request.url else "youtube_channel")
+    if sub_type not in ("podcast", "youtube_channel"):
+        raise HTTPException(status_code=400, detail=f"Unknown subscription type: {sub_type}")
+    
+    max_items = min(request.max_items, 5 if sub_type == "podcast" else 10)
+    sub_id = hashlib.md5(f"{sub_type}|{request.url}".encode()).hexdigest()[:12]
+    
+    with _subscriptions_lock:
+        subscriptions = load_subscriptions()
+        subscriptions[sub_id] = {
+            "id": sub_id,
+            "type": sub_type,
+            "url": request.url,
+            "max_items": max_items,
+            "custom_prompt": request.custom_prompt,
+            "interval_seconds": SUBSCRIPTION_INITIAL_INTERVAL,
+            "next_check": 0,
+            "last_item_urls": [],
+            "created_at": datetime.now().isoformat()
+        }
+        write_json_atomic(SUBSCRIPTIONS_FILE, subscriptions)
+    
+    print(f"📡 Subscribed to {sub_type}: {request.url}")
+    return subscriptions[sub_id]
+
+@app.get("/subscriptions")
+def get_subscriptions():
+    """List subscriptions and the pending work queue size"""
+    return {
+        "poller_enabled": SUBSCRIPTION_POLLER_ENABLED,
+        "queued_jobs": _subscription_queue.qsize(),
+        "subscriptions": list(load_subscriptions().values())
+    }
+
+@app.delete("/subscriptions/{sub_id}")
+def delete_subscription(sub_id: str):
+    """Remove a subscription"""
+    with _subscriptions_lock:
+        subscriptions = load_subscriptions()
+        if sub_id not in subscriptions:
+            raise HTTPException(status_code=404, detail="Subscription not found")
+        removed = subscriptions.pop(sub_id)
+        write_json_atomic(SUBSCRIPTIONS_FILE, subscriptions)
+    return {"deleted": removed["id"], "url": removed["url"]}
+
+# Bulk summarization: Map-phase requests of many transcripts submitted as Message Batches
+CLAUDE_BATCH_BASE_URL = os.getenv("CLAUDE_BATCH_BASE_URL")  # e.g. http://localhost:8100 for batch_standin_server.py
+BULK_BATCH_MAX_REQUESTS = int(os.getenv("BULK_BATCH_MAX_REQUESTS", "10000"))
+BULK_POLL_SECONDS = int(os.getenv("BULK_POLL_SECONDS", "60"))
+BULK_JOBS_FILE = CACHE_DIR / "bulk_jobs.json"
+_bulk_jobs_lock = threading.Lock()
+
+class BulkSummaryRequest(BaseModel):
+    urls: List[str] = []  # video URLs
+    channel_urls: List[str] = []  # channels whose latest max_videos videos are included
+    max_videos: int = 50
+    custom_prompt: Optional[str] = None
+    finalize: bool = True  # build the per-video summaries (Reduce) once the Map results are cached
+
+def load_bulk_jobs() -> dict:
+    """Read the bulk job registry"""
+    if not BULK_JOBS_FILE.exists():
+        return {}
+    try:
+        with open(BULK_JOBS_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"⚠️ Bulk job registry read error: {e}")
+        return {}
+
+def update_bulk_job(job_id: str, **fields):
+    """Update fields of one bulk job"""
+    with _bulk_jobs_lock:
+        jobs = load_bulk_jobs()
+        if job_id in jobs:
+            jobs[job_id].update(fields, updated_at=datetime.now().isoformat())
+            write_json_atomic(BULK_JOBS_FILE, jobs)
+
+def get_batch_client():
+    """Client for the Message Batches API (or a stand-in at CLAUDE_BATCH_BASE_URL)"""
+    if CLAUDE_BATCH_BASE_URL:
+        return Anthropic(api_key=ANTHROPIC_API_KEY or "stand-in", base_url=CLAUDE_BATCH_BASE_URL)
+    return anthropic_client
+
+def submit_map_batches(pending: dict, base_prompt: str, job_id: str) -> tuple:
+    """
+    Submit uncached chunks ({chunk cache key: chunk}) as Message Batches, poll until
+    they end and write the results into the chunk cache. Returns (succeeded, errored).
+    """
+    client = get_batch_client()
+    chunk_keys = list(pending)
+    batch_ids = []
+    for start in range(0, len(chunk_keys), BULK_BATCH_MAX_REQUESTS):
+        batch = client.messages.batches.create(requests=[
+            {"custom_id": chunk_key, "params": build_claude_request(base_prompt, pending[chunk_key])}
+            for chunk_key in chunk_keys[start:start + BULK_BATCH_MAX_REQUESTS]
+        ])
+        print(f"📤 Submitted batch {batch.id} ({min(BULK_BATCH_MAX_REQUESTS, len(chunk_keys) - start)} requests)")
+        batch_ids.append(batch.id)
+    update_bulk_job(job_id, status="submitted", batch_ids=batch_ids)
+    
+    succeeded = errored = 0
+    for batch_id in batch_ids:
+        batch = client.messages.batches.retrieve(batch_id)
+        while batch.processing_status != "ended":
+            time.sleep(BULK_POLL_SECONDS)
+            batch = client.messages.batches.retrieve(batch_id)
+            print(f"⏳ Batch {batch_id}: {batch.processing_status}")
+        
+        for entry in client.messages.batches.results(batch_id):
+            if entry.result.type == "succeeded" and entry.custom_id in pending:
+                record_claude_usage(entry.result.message, "batch", 0)
+                save_chunk_summary(pending[entry.custom_id], base_prompt, entry.result.message.content[0].text)
+                succeeded += 1
+            else:
+                errored += 1
+        update_bulk_job(job_id, succeeded=succeeded, errored=errored)
+    return succeeded, errored
+
+def run_bulk_job(job_id: str, request: BulkSummaryRequest):
+    """Collect transcripts, batch their uncached Map requests, then optionally finalize the summaries"""
+    try:
+        base_prompt = request.custom_prompt or DEFAULT_SUMMARY_PROMPT
+        videos = [{'title': url, 'url': url} for url in request.urls]
+        for channel_url in request.channel_urls:
+            videos.extend(get_channel_videos(channel_url, request.max_videos))
+        videos = list({video['url']: video for video in videos}.values())
+        update_bulk_job(job_id, status="collecting", videos=len(videos))
+        
+        contents, processed = gather_items(
+            videos,
+            lambda video: {'content': build_video_content(get_subtitles(VideoRequest(url=video['url'])))}
+        )
+        
+        # Map requests not answered by the chunk cache or an existing video summary
+        pending = {}
+        for item in contents:
+            content_hash = hash_content(item['content'])
+            save_url_index(item['url'], content_hash=content_hash)
+            if (CACHE_DIR / f"summary_{get_item_summary_key(content_hash, request.custom_prompt)}.json").exists():
+                continue
+            summary_input, _ = compact_transcript(item['content'])
+            for chunk in get_map_chunks(summary_input, base_prompt) or [summary_input]:
+                if not get_chunk_cache_file(chunk, base_prompt).exists():
+                    pending[summary_cache_key(hash_content(chunk), base_prompt)] = chunk
+        update_bulk_job(
+            job_id,
+            transcripts=len(contents),
+            failed=[p for p in processed if not p['has_subtitles']],
+            requests=len(pending)
+        )
+        
+        if pending:
+            succeeded, errored = submit_map_batches(pending, base_prompt, job_id)
+            print(f"✅ Bulk job {job_id}: {succeeded} Map results cached, {errored} errored")
+        
+        if request.finalize:
+            update_bulk_job(job_id, status="finalizing")
+            summaries = []
+            for item in contents:
+                try:
+                    result = run_video_summary(VideoSummaryRequest(url=item['url'], custom_prompt=request.custom_prompt))
+                    summaries.append({'url': item['url'], 'title': result['title'], 'view_url': result['view_url']})
+                except Exception as e:
+                    summaries.append({'url': item['url'], 'error': str(e)})
+            update_bulk_job(job_id, summaries=summaries)
+        
+        update_bulk_job(job_id, status="done", finished_at=datetime.now().isoformat())
+    except Exception as e:
+        print(f"❌ Bulk job {job_id} failed: {e}")
+        update_bulk_job(job_id, status="failed", error=str(e))
+
+@app.post("/bulk/summaries")
+def create_bulk_job(request: BulkSummaryRequest):
+    """Start an offline bulk summarization job (Map phase via Message Batches)"""
+    if not get_batch_client():
+        raise HTTPException(
+            status_code=503,
+            detail="Bulk summarization not available - ANTHROPIC_API_KEY or CLAUDE_BATCH_BASE_URL not configured"
+        )
+    if not request.urls and not request.channel_urls:
+        raise HTTPException(status_code=400, detail="No urls or channel_urls given")
+    
+    job_id = uuid.uuid4().hex[:12]
+    with _bulk_jobs_lock:
+        jobs = load_bulk_jobs()
+        jobs[job_id] = {
+            "id": job_id,
+            "status": "queued",
+            "request": request.model_dump(),
+            "created_at": datetime.now().isoformat(),
+            "updated_at": datetime.now().isoformat()
+        }
+        write_json_atomic(BULK_JOBS_FILE, jobs)
+    
+    threading.Thread(target=run_bulk_job, args=(job_id, request), name=f"bulk-{job_id}", daemon=True).start()
+    print(f"📦 Started bulk job {job_id}")
+    return jobs[job_id]
+
+@app.get("/bulk/summaries")
+def list_bulk_jobs():
+    """List bulk summarization jobs"""
+    return {"jobs": list(load_bulk_jobs().values())}
+
+@app.get("/bulk/summaries/{job_id}")
+def get_bulk_job(job_id: str):
+    """Status of one bulk summarization job"""
+    jobs = load_bulk_jobs()
+    if job_id not in jobs:
+        raise HTTPException(status_code=404, detail="Bulk job not found")
+    return jobs[job_id]
+
+@app.get("/whisper/models")
+def list_whisper_models():
+    """List Whisper registry entries and which ones are currently loaded"""
+    with _whisper_models_lock:
+        loaded = list(_whisper_models)
+    
+    return {
+        "default_model": WHISPER_MODEL_SIZE,
+        "memory_budget_mb": WHISPER_MEMORY_BUDGET_MB,
+        "memory_in_use_mb": sum(WHISPER_MODEL_SPECS[n]["memory_mb"] for n in loaded),
+        "models": [
+            {"name": name, **spec, "loaded": name in loaded}
+            for name, spec in WHISPER_MODEL_SPECS.items()
+        ]
+    }
+
+@app.get("/metrics/transcription")
+def get_transcription_metrics(model: Optional[str] = None, language_source: Optional[str] = None,
+                              since: Optional[str] = None, limit: int = 20):
+    """Percentiles of transcription performance, optionally filtered by model / language source / date"""
+    history = load_transcription_metrics()
+    if model:
+        history = [m for m in history if m["model"] == model]
+    if language_source:
+        history = [m for m in history if m.get("language_source") == language_source]
+    if since:
+        history = [m for m in history if m["recorded_at"] >= since]
+    
+    def summarize(records: List[dict]) -> dict:
+        stats = {"count": len(records)}
+        for field in ("real_time_factor", "decode_seconds", "audio_seconds", "segments_per_second"):
+            values = [r[field] for r in records if r.get(field) is not None]
+            stats[field] = {
+                f"p{pct}": round(percentile(values, pct), 4) if values else None
+                for pct in (50, 90, 95, 99)
+            }
+        return stats
+    
+    by_model = {}
+    for record in history:
+        by_model.setdefault(record["model"], []).append(record)
+    
+    return {
+        "overall": summarize(history),
+        "by_model": {name: summarize(records) for name, records in by_model.items()},
+        "recent": history[-limit:] if limit > 0 else []
+    }
+
+@app.get("/metrics/claude")
+def get_claude_metrics(stage: Optional[str] = None, since: Optional[str] = None, limit: int = 20):
+    """Claude token usage and prompt cache effectiveness, optionally filtered by stage / date"""
+    history = load_claude_usage()
+    if stage:
+        history = [r for r in history if r["stage"] == stage]
+    if since:
+        history = [r for r in history if r["recorded_at"] >= since]
+    
+    def summarize(records: List[dict]) -> dict:
+        totals = {
+            field: sum(r[field] for r in records)
+            for field in ("input_tokens", "output_tokens", "cache_creation_input_tokens", "cache_read_input_tokens")
+        }
+        prompt_tokens = totals["input_tokens"] + totals["cache_creation_input_tokens"] + totals["cache_read_input_tokens"]
+        seconds = [r["seconds"] for r in records]
+        return {
+            "count": len(records),
+            **totals,
+            "cache_read_ratio": round(totals["cache_read_input_tokens"] / prompt_tokens, 4) if prompt_tokens else None,
+            "seconds": {f"p{pct}": round(percentile(seconds, pct), 3) if seconds else None for pct in (50, 90, 99)}
+        }
+    
+    by_stage = {}
+    for record in history:
+        by_stage.setdefault(record["stage"], []).append(record)
+    
+    return {
+        "overall": summarize(history),
+        "by_stage": {name: summarize(records) for name, records in by_stage.items()},
+        "recent": history[-limit:] if limit > 0 else []
+    }
+
+@app.get("/metrics/http")
+def get_http_metrics():
+    """Connection reuse and error counts for the shared outbound HTTP session"""
+    return {
+        "pool_maxsize": HTTP_POOL_MAXSIZE,
+        "hosts": get_http_pool_stats()
+    }
+
 @app.get("/cache/stats")
 def get_cache_stats():
     """Get cache statistics"""
@@ -1294,8 +3355,8 @@ def get_cache_stats():
 
 @app.delete("/cache/clear")
 def clear_cache():
-    """Clear all cache files"""
-    cache_files = list(CACHE_DIR.glob("*.json"))
+    """Clear all cache files (the subscription and bulk job registries are not cache and are kept)"""
+    cache_files = [f for f in CACHE_DIR.glob("*.json") if f not in (SUBSCRIPTIONS_FILE, BULK_JOBS_FILE)]
     count = 0
     
     for f in cache_files:
@@ -1370,11 +3431,7 @@ def get_taiwan_stock(stock_id: str):
         # This endpoint provides real-time stock information from Taiwan Stock Exchange
         url = f"https://mis.twse.com.tw/stock/api/getStockInfo.jsp?ex_ch=tse_{stock_id}.tw"
         
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        
-        response = requests.get(url, headers=headers, timeout=10)
+        response = http_get(url)
         response.raise_for_status()
         
         data = response.json()
@@ -1384,7 +3441,7 @@ def get_taiwan_stock(stock_id: str):
         if 'msgArray' not in data or len(data['msgArray']) == 0 or 'n' not in data['msgArray'][0]:
             # Try OTC (over-the-counter) market
             url_otc = f"https://mis.twse.com.tw/stock/api/getStockInfo.jsp?ex_ch=otc_{stock_id}.tw"
-            response_otc = requests.get(url_otc, headers=headers, timeout=10)
+            response_otc = http_get(url_otc)
             response_otc.raise_for_status()
             data_otc = response_otc.json()
             